@@ -0,0 +1,174 @@
+"""
+A/B compares the one-pass grading mode to the two-pass pipeline on stored
+inputs: the scores each mode gives, its latency, LLM calls and estimated
+tokens.
+
+Inputs are a JSON Lines file with one graded interview per line, holding the
+"interview_question", "conf_score", "response_text", "job_requirements" and
+"resume_text" (parsed resume markdown) the app passes to the grader, plus an
+optional "id".
+
+Usage:
+    python benchmarks/grading_ab_benchmark.py --inputs interviews.jsonl \
+        [--llm-config src/configs/llm/openai-gpt-4o-mini.yaml] \
+        [--resume-token-budget 1500] [--output results.csv]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.llm import get_llm
+from src.service.interview_grader import (
+    GRADING_MODES,
+    ONE_PASS,
+    TWO_PASS,
+    InterviewGrader,
+)
+from src.service.resume_sections import ResumeSectionSelector, estimate_tokens
+
+
+class CountingLLM(BaseLLMProvider):
+    """
+    Counts the calls and estimated prompt & completion tokens of an LLM
+    """
+
+    def __init__(self, llm: BaseLLMProvider):
+        self._llm = llm
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def complete(self, prompt: str = "") -> str:
+        completion = self._llm.complete(prompt)
+        self._count(prompt, completion)
+        return completion
+
+    def stream_complete(self, prompt: str = ""):
+        completion = ""
+        for delta in self._llm.stream_complete(prompt):
+            completion += delta
+            yield delta
+        self._count(prompt, completion)
+
+    async def acomplete(self, prompt: str = "") -> str:
+        completion = await self._llm.acomplete(prompt)
+        self._count(prompt, completion)
+        return completion
+
+    def _count(self, prompt: str, completion: str):
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+        self.completion_tokens += estimate_tokens(completion)
+
+
+def load_inputs(inputs_file: str) -> list[dict]:
+    with open(inputs_file, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_case(
+    grader: InterviewGrader, llm: CountingLLM, case: dict, resume_text: str, mode: str
+) -> dict:
+    llm.reset()
+    start = time.perf_counter()
+    try:
+        result = grader.grade(
+            interview_question=case["interview_question"],
+            conf_score=case["conf_score"],
+            response_text=case["response_text"],
+            job_requirements=case["job_requirements"],
+            resume_text=resume_text,
+            mode=mode,
+        )
+        score, error = float(result["score"]), None
+    except Exception as e:
+        score, error = np.nan, str(e)
+
+    return {
+        "mode": mode,
+        "score": score,
+        "latency": time.perf_counter() - start,
+        "calls": llm.calls,
+        "prompt_tokens": llm.prompt_tokens,
+        "completion_tokens": llm.completion_tokens,
+        "error": error,
+    }
+
+
+def summarize(results: pd.DataFrame):
+    print(
+        f"{'mode':<10} {'latency':>9} {'calls':>6} {'prompt tok':>11} "
+        f"{'compl. tok':>11} {'failures':>9}"
+    )
+    for mode in GRADING_MODES:
+        rows = results[results["mode"] == mode]
+        print(
+            f"{mode:<10} {rows['latency'].mean():8.1f}s {rows['calls'].mean():6.1f} "
+            f"{rows['prompt_tokens'].mean():11.0f} "
+            f"{rows['completion_tokens'].mean():11.0f} "
+            f"{rows['error'].notna().sum():9d}"
+        )
+
+    scores = results.pivot(index="id", columns="mode", values="score").dropna()
+    if scores.empty:
+        print("\nNo case was scored by both modes.")
+        return
+    diff = scores[ONE_PASS] - scores[TWO_PASS]
+    print(f"\nScores of {len(scores)} cases, one-pass - two-pass:")
+    print(f"  mean difference:     {diff.mean():+.1f}")
+    print(f"  mean abs difference: {diff.abs().mean():.1f}")
+    print(f"  max abs difference:  {diff.abs().max():.1f}")
+    print(f"  within 10 points:    {(diff.abs() <= 10).mean():.0%}")
+    if len(scores) > 1:
+        correlation = np.corrcoef(scores[ONE_PASS], scores[TWO_PASS])[0, 1]
+        print(f"  correlation:         {correlation:.2f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument("--inputs", required=True)
+    arg_parser.add_argument(
+        "--llm-config", default="src/configs/llm/openai-gpt-4o-mini.yaml"
+    )
+    arg_parser.add_argument("--resume-token-budget", type=int, default=1500)
+    arg_parser.add_argument("--output", help="CSV file of the per-case results")
+    args = arg_parser.parse_args()
+
+    llm = CountingLLM(get_llm(args.llm_config))
+    grader = InterviewGrader(llm)
+    section_selector = ResumeSectionSelector(token_budget=args.resume_token_budget)
+
+    rows = []
+    for i, case in enumerate(load_inputs(args.inputs)):
+        case_id = case.get("id", i)
+        # as in the app, both modes get the job-relevant resume sections
+        resume_text = section_selector.select(
+            case["resume_text"], case["job_requirements"]
+        )
+        for mode in GRADING_MODES:
+            row = run_case(grader, llm, case, resume_text, mode)
+            rows.append({"id": case_id, **row})
+            print(f"{case_id}: {mode:<8} score {row['score']:5.1f}")
+
+    results = pd.DataFrame(rows)
+    print()
+    summarize(results)
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
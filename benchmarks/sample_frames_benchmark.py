@@ -0,0 +1,89 @@
+"""
+Benchmarks the frame sampling methods of sample_frames() on a synthetic clip.
+
+Usage:
+    python benchmarks/sample_frames_benchmark.py [--seconds 60] [--fps 30]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.utils.utils import sample_frames
+
+
+def make_synthetic_clip(
+    output_file: str, seconds: int = 60, fps: int = 30, size: tuple = (1280, 720)
+) -> str:
+    """
+    Writes a synthetic clip of a moving gradient with some noise, so that
+    the encoder cannot trivially skip frames.
+    """
+    width, height = size
+    writer = cv2.VideoWriter(
+        output_file, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height)
+    )
+    rng = np.random.default_rng(0)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+
+    for i in range(seconds * fps):
+        frame = np.roll(gradient, i * 4, axis=1)
+        frame = np.dstack([frame, frame[::-1], np.full_like(frame, i % 256)])
+        noise = rng.integers(0, 16, size=frame.shape, dtype=np.uint8)
+        writer.write(cv2.add(frame, noise))
+    writer.release()
+
+    return output_file
+
+
+def time_sampling(video_file: str, repeat: int = 3, **kwargs) -> tuple:
+    best, n_frames = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = sample_frames(video_file, **kwargs)
+        best = min(best, time.perf_counter() - start)
+        n_frames = len(frames)
+    return best, n_frames
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seconds", type=int, default=60)
+    arg_parser.add_argument("--fps", type=int, default=30)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    cases = [
+        ("read, sample_rate=24", dict(sample_rate=24, method="read")),
+        ("grab, sample_rate=24", dict(sample_rate=24, method="grab")),
+        ("seek, sample_rate=24", dict(sample_rate=24, method="seek")),
+        ("read, target_fps=1", dict(target_fps=1, method="read")),
+        ("grab, target_fps=1", dict(target_fps=1, method="grab")),
+        ("seek, target_fps=1", dict(target_fps=1, method="seek")),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_file = make_synthetic_clip(
+            str(Path(tmp_dir) / "synthetic.mp4"), args.seconds, args.fps
+        )
+        print(f"Synthetic clip: {args.seconds}s @ {args.fps}fps, 1280x720")
+
+        baseline = {}
+        for name, kwargs in cases:
+            elapsed, n_frames = time_sampling(video_file, args.repeat, **kwargs)
+            key = "sample_rate" if "sample_rate" in kwargs else "target_fps"
+            baseline.setdefault(key, elapsed)
+            print(
+                f"{name:<24} {elapsed:8.3f}s {n_frames:6d} frames "
+                f"speedup x{baseline[key] / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
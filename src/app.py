@@ -1,25 +1,37 @@
 import gradio as gr
+import numpy as np
 import pandas as pd
+import speech_recognition as sr
+import os
+import yaml
 import logging
 from pathlib import Path
 from docx import Document
-from typing import Optional, List
+from importlib.metadata import version
+from typing import Iterable, Iterator, Optional, List, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
 from src.archive.sample_inputs import INTERVIEW_QUESTION, JOB_REQUIREMENTS
 from src.configs.database.firebase import write_user_data, read_all_users
 from src.llm.llm import get_llm
+from src.service.chunked_transcriber import ChunkedTranscriber
 from src.service.emotion_recognition import EmotionRecognition
+from src.service.frame_selector import AdaptiveFrameSelector
+from src.service.interview_grader import (
+    GRADING_MODES,
+    TWO_PASS,
+    InterviewGrader,
+)
+from src.service.media_ingest import MediaIngest
+from src.service.parallel_emotion import ParallelEmotionAnalyzer
 from src.service.resume_parser import ResumeParser
+from src.service.resume_sections import ResumeSectionSelector
+from src.transcription.transcriber import get_transcriber
+from src.utils.cache import DiskCache, hash_bytes, hash_file, make_key
 from src.utils.utils import (
-    parse_yaml_string,
-    extract_audio,
-    audio2text,
-    sample_frames,
-)
-from src.template.grading_prompt import (
-    GRADE_RESPONSE_PROMPT,
-    RANKING_AND_FEEDBACK_PROMPT,
+    extract_audio_pcm,
+    iter_frames,
+    sampled_fps,
 )
 
 load_dotenv()
@@ -31,13 +43,52 @@ load_dotenv()
 # else:  # Assume hosted on Hugging Face Spaces
 BASE_DIR = Path(".").resolve()
 
-LLM_CONFIG_FILE = BASE_DIR / "configs/llm/openai-gpt-3.5-turbo.yaml"
+# e.g. configs/llm/hedged-openai-nvidia.yaml to hedge & fail over between providers
+LLM_CONFIG_FILE = BASE_DIR / os.getenv(
+    "LLM_CONFIG", "configs/llm/openai-gpt-3.5-turbo.yaml"
+)
 LLM_CONFIG_FILE_NVD = (
     BASE_DIR / "configs/llm/nvidia-llama-3.1-nemotron-70b-instruct.yaml"
 )
 RESUME_PARSER_CONFIG_FILE = BASE_DIR / "configs/parser/llamaparse_en.yaml"
-OUTPUT_AUDIO_FILE_EMPTY = BASE_DIR / "output/audio_output.wav"
+TRANSCRIBER_CONFIG_FILE = BASE_DIR / "configs/transcription/google-en.yaml"
 OUTPUT_REPORT_FILE_EMPTY = BASE_DIR / "output/report.docx"
+EMOTION_BATCH_SIZE = 32
+EMOTION_MIN_FPS = 0.5
+EMOTION_MAX_FPS = 2.0
+# luminance change for a frame to be analysed, see AdaptiveFrameSelector
+EMOTION_FRAME_THRESHOLD = 6.0
+# analyse emotions on a process pool when > 1
+EMOTION_WORKERS = int(os.getenv("EMOTION_WORKERS", "1"))
+# speech chunks sent to the recognizer concurrently
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "4"))
+# estimated tokens of the resume put in the ranking prompt
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "1500"))
+# default grading mode of a job, "two-pass" or "one-pass" (see InterviewGrader)
+GRADING_MODE = os.getenv("GRADING_MODE", TWO_PASS)
+LLM_CACHE_FILE = BASE_DIR / "cache/llm.sqlite"
+LLM_CACHE_MAX_BYTES = 64 * 1024**2
+LLM_CACHE_TTL = 7 * 24 * 3600
+RESUME_CACHE_FILE = BASE_DIR / "cache/resumes.sqlite"
+RESUME_CACHE_MAX_BYTES = 64 * 1024**2
+TRANSCRIPT_CACHE_FILE = BASE_DIR / "cache/transcripts.sqlite"
+TRANSCRIPT_CACHE_MAX_BYTES = 64 * 1024**2
+# always transcribe again when set, e.g. to compare backends
+TRANSCRIPT_CACHE_BYPASS = os.getenv("TRANSCRIPT_CACHE_BYPASS", "0") == "1"
+EMOTION_CACHE_FILE = BASE_DIR / "cache/emotions.sqlite"
+EMOTION_CACHE_MAX_BYTES = 512 * 1024**2
+# everything cached emotion results depend on, besides the video itself
+EMOTION_CACHE_PARAMS = {
+    "deepface": version("deepface"),
+    "model": "Emotion",
+    "detector_backend": "opencv",
+    "face_tracking": True,
+    "min_fps": EMOTION_MIN_FPS,
+    "max_fps": EMOTION_MAX_FPS,
+    "frame_threshold": EMOTION_FRAME_THRESHOLD,
+    # frames are selected per segment, one per worker in parallel
+    "workers": EMOTION_WORKERS,
+}
 
 
 @dataclass
@@ -57,7 +108,14 @@ class GradioInterface:
 
     def __init__(self):
         self.parser = None
+        self.section_selector = None
         self.llm = None
+        self.grader = None
+        self.emotion_analyzer = None
+        self.emotion_cache = None
+        self.transcriber = None
+        self.transcriber_config = None
+        self.transcript_cache = None
         self.logger = None
         self.candidate_feedback = pd.DataFrame(columns=["Name", "Score", "Feedback"])
         self.setup_logging()
@@ -72,8 +130,49 @@ class GradioInterface:
 
     def initialize_services(self):
         try:
-            self.llm = get_llm(str(LLM_CONFIG_FILE))
-            self.parser = ResumeParser(str(RESUME_PARSER_CONFIG_FILE))
+            self.llm = get_llm(
+                str(LLM_CONFIG_FILE),
+                cache=DiskCache(
+                    str(LLM_CACHE_FILE),
+                    max_bytes=LLM_CACHE_MAX_BYTES,
+                    name="llm-cache",
+                ),
+                cache_ttl=LLM_CACHE_TTL,
+            )
+            self.parser = ResumeParser(
+                str(RESUME_PARSER_CONFIG_FILE),
+                cache=DiskCache(
+                    str(RESUME_CACHE_FILE),
+                    max_bytes=RESUME_CACHE_MAX_BYTES,
+                    name="resume-cache",
+                ),
+            )
+            self.grader = InterviewGrader(self.llm)
+            self.section_selector = ResumeSectionSelector(
+                token_budget=RESUME_TOKEN_BUDGET
+            )
+            self.transcriber = ChunkedTranscriber(
+                get_transcriber(str(TRANSCRIBER_CONFIG_FILE)).transcribe,
+                max_workers=TRANSCRIPTION_WORKERS,
+            )
+            with open(TRANSCRIBER_CONFIG_FILE, "r") as f:
+                self.transcriber_config = yaml.safe_load(f)
+            self.transcript_cache = DiskCache(
+                str(TRANSCRIPT_CACHE_FILE),
+                max_bytes=TRANSCRIPT_CACHE_MAX_BYTES,
+                name="transcript-cache",
+            )
+            self.emotion_cache = DiskCache(
+                str(EMOTION_CACHE_FILE),
+                max_bytes=EMOTION_CACHE_MAX_BYTES,
+                name="emotion-cache",
+            )
+            if EMOTION_WORKERS > 1:
+                self.emotion_analyzer = ParallelEmotionAnalyzer(
+                    n_workers=EMOTION_WORKERS
+                )
+            else:
+                EmotionRecognition.warm_up(batch_size=EMOTION_BATCH_SIZE)
         except Exception as e:
             self.logger.error(f"Failed to initialize services: {str(e)}")
             raise
@@ -105,17 +204,106 @@ class GradioInterface:
         )
 
     def process_video(self, video_path: str) -> Optional[str]:
-        OUTPUT_AUDIO_FILE = extract_audio(video_path, str(OUTPUT_AUDIO_FILE_EMPTY))
-        audio_text = audio2text(OUTPUT_AUDIO_FILE)
+        audio = extract_audio_pcm(video_path)
+        audio_text = self.transcribe_audio(audio)
+        return audio_text
+
+    def transcribe_audio(
+        self, audio: sr.AudioData, use_cache: bool = not TRANSCRIPT_CACHE_BYPASS
+    ) -> str:
+        """
+        Returns the transcript of the decoded audio, from the transcript cache
+        if the same audio was already transcribed with the same backend
+        """
+        cache_key = make_key(
+            hash_bytes(audio.frame_data),
+            audio.sample_rate,
+            audio.sample_width,
+            self.transcriber_config,
+            self.transcriber.split_kwargs,
+        )
+        if use_cache:
+            cached = self.transcript_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        audio_text = self.transcriber.transcribe(audio)
+        self.transcript_cache.set(cache_key, audio_text)
         return audio_text
 
     def analyze_emotions(self, video_path: str) -> Optional[str]:
-        frames = sample_frames(video_path, sample_rate=24)
-        emotions = EmotionRecognition.detect_face_emotions(frames)
-        emotions_dict = EmotionRecognition.process_emotions(emotions)
+        cache_key = self._emotion_cache_key(video_path)
+        cached = self.emotion_cache.get(cache_key)
+        if cached is not None:
+            return cached["conf"]
+
+        if self.emotion_analyzer is not None:
+            return self._analyze_emotions_parallel(video_path, cache_key)
+
+        frames = iter_frames(video_path, target_fps=EMOTION_MAX_FPS)
+        emotions, weights = self._detect_emotions(
+            frames, sampled_fps(video_path, target_fps=EMOTION_MAX_FPS)
+        )
+        return self._score_emotions(cache_key, emotions, weights)
+
+    def process_media(self, video_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Decodes the video a single time, and returns both the transcript of
+        its audio and the confidence score of its frames.
+        """
+        cache_key = self._emotion_cache_key(video_path)
+        cached = self.emotion_cache.get(cache_key)
+
+        if cached is None and self.emotion_analyzer is None:
+            with MediaIngest(video_path, target_fps=EMOTION_MAX_FPS) as media:
+                # ffmpeg resamples the frames to exactly EMOTION_MAX_FPS
+                emotions, weights = self._detect_emotions(media.iter_frames())
+                conf_score = self._score_emotions(cache_key, emotions, weights)
+                audio_text = self.transcribe_audio(media.read_audio())
+            return audio_text, conf_score
+
+        # frames are either cached or decoded by the worker processes
+        if cached is not None:
+            conf_score = cached["conf"]
+        else:
+            conf_score = self._analyze_emotions_parallel(video_path, cache_key)
+        audio_text = self.transcribe_audio(extract_audio_pcm(video_path))
+        return audio_text, conf_score
+
+    def _analyze_emotions_parallel(self, video_path: str, cache_key: str) -> float:
+        emotions, weights = self.emotion_analyzer.analyze(
+            video_path,
+            target_fps=EMOTION_MAX_FPS,
+            min_fps=EMOTION_MIN_FPS,
+            threshold=EMOTION_FRAME_THRESHOLD,
+            batch_size=EMOTION_BATCH_SIZE,
+        )
+        return self._score_emotions(cache_key, emotions, weights)
+
+    def _detect_emotions(
+        self, frames: Iterable[np.ndarray], fps: Optional[float] = None
+    ) -> Tuple[list, list]:
+        selector = AdaptiveFrameSelector(
+            min_fps=EMOTION_MIN_FPS,
+            max_fps=EMOTION_MAX_FPS,
+            threshold=EMOTION_FRAME_THRESHOLD,
+        )
+        emotions = EmotionRecognition.detect_face_emotions_tracked(
+            selector.select(frames, fps), batch_size=EMOTION_BATCH_SIZE
+        )
+        return emotions, selector.weights
+
+    def _score_emotions(self, cache_key: str, emotions: list, weights: list) -> float:
+        emotions_dict = EmotionRecognition.process_emotions(emotions, weights=weights)
         conf_score = emotions_dict["conf"]
+        self.emotion_cache.set(
+            cache_key, {"emotions": emotions, "weights": weights, "conf": conf_score}
+        )
         return conf_score
 
+    def _emotion_cache_key(self, video_path: str) -> str:
+        return make_key(hash_file(video_path), EMOTION_CACHE_PARAMS)
+
     def process_resume(self, resume_path: str) -> Optional[str]:
         resume_md = self.parser.parse_resume_to_markdown(resume_path)
         return resume_md
@@ -152,35 +340,72 @@ class GradioInterface:
         conf_score: str,
         audio_text: str,
         resume_md: str,
+        grading_mode: str = GRADING_MODE,
     ) -> pd.DataFrame:
-
-        formatted_grading_prompt = GRADE_RESPONSE_PROMPT.format(
+        for _, feedback_df in self.stream_feedback(
+            itv_question,
+            job_requirements,
+            conf_score,
+            audio_text,
+            resume_md,
+            grading_mode,
+        ):
+            pass
+        return feedback_df
+
+    def stream_feedback(
+        self,
+        itv_question: str,
+        job_requirements: str,
+        conf_score: str,
+        audio_text: str,
+        resume_md: str,
+        grading_mode: str = GRADING_MODE,
+    ) -> Iterator[Tuple[str, Optional[pd.DataFrame]]]:
+        """
+        Streams the LLM grading in 'grading_mode', yielding the markdown of the
+        text generated so far with no feedback yet, then the parsed feedback
+        once the last stream has ended.
+        """
+        for progress in self.grader.stream_grade(
             interview_question=itv_question,
             conf_score=conf_score,
             response_text=audio_text,
-        )
-
-        grade = self.llm.complete(formatted_grading_prompt)
-
-        formatted_ranking_prompt = RANKING_AND_FEEDBACK_PROMPT.format(
             job_requirements=job_requirements,
-            interview_feedback=grade,
-            resume_text=resume_md,
-        )
-        rank_and_feedback = self.llm.complete(formatted_ranking_prompt)
-
-        expected_keys = ["name", "score", "feedback"]
-        rank_and_feedback_dict = parse_yaml_string(
-            yaml_string=rank_and_feedback, expected_keys=expected_keys, cleanup=True
-        )
+            resume_text=self.section_selector.select(resume_md, job_requirements),
+            mode=grading_mode,
+        ):
+            progress_md = self.format_progress_to_markdown(
+                progress.grade, progress.rank_and_feedback
+            )
+            if progress.result is None:
+                yield progress_md, None
 
-        return pd.DataFrame(
+        rank_and_feedback_dict = progress.result
+        feedback_df = pd.DataFrame(
             {
                 "Name": rank_and_feedback_dict["name"],
                 "Score": rank_and_feedback_dict["score"],
                 "Feedback": rank_and_feedback_dict["feedback"],
             }
         )
+        yield progress_md, feedback_df
+
+    def format_progress_to_markdown(
+        self, grade: str, rank_and_feedback: Optional[str] = None
+    ) -> str:
+        markdown_text = f"""
+# Candidate Assessment in Progress ⏳
+
+## Interview Grading ✍️
+{grade}
+"""
+        if rank_and_feedback is not None:
+            markdown_text += f"""
+## Ranking & Feedback 🧮
+{rank_and_feedback}
+"""
+        return markdown_text
 
     def process_submission(
         self,
@@ -189,27 +414,55 @@ class GradioInterface:
         interview_questions: str,
         job_title: str,
         job_requirements: str,
+        grading_mode: str = GRADING_MODE,
     ) -> ProcessingResult:
+        for result in self.process_submission_stream(
+            video_path,
+            resume_path,
+            interview_questions,
+            job_title,
+            job_requirements,
+            grading_mode,
+        ):
+            pass
+        return result
+
+    def process_submission_stream(
+        self,
+        video_path: str,
+        resume_path: str,
+        interview_questions: str,
+        job_title: str,
+        job_requirements: str,
+        grading_mode: str = GRADING_MODE,
+    ) -> Iterator[ProcessingResult]:
+        """
+        Processes a submission, yielding partial results with the assessment
+        markdown as the LLM generates it, then the final result.
+        """
         try:
             # Validate inputs
             error_message = self.validate_inputs(
                 video_path, resume_path, interview_questions, job_requirements
             )
             if error_message:
-                return ProcessingResult(error_message=error_message)
+                yield ProcessingResult(error_message=error_message)
+                return
 
             # Process inputs
-            video_transcript = self.process_video(video_path)
-            emotion_analysis = self.analyze_emotions(video_path)
+            video_transcript, emotion_analysis = self.process_media(video_path)
             resume_analysis = self.process_resume(resume_path)
 
-            feedback_list = self.get_feedback(
+            for progress_md, feedback_list in self.stream_feedback(
                 interview_questions,
                 job_requirements,
                 emotion_analysis,
                 video_transcript,
                 resume_analysis,
-            )
+                grading_mode,
+            ):
+                if feedback_list is None:
+                    yield ProcessingResult(feedback_md=progress_md)
 
             # Update feedback database
             self.candidate_feedback = pd.concat(
@@ -244,7 +497,7 @@ class GradioInterface:
 
             feedback_md = self.format_feedback_to_markdown(self.candidate_feedback)
 
-            return ProcessingResult(
+            yield ProcessingResult(
                 candidate_name=self.candidate_feedback["Name"].iloc[0],
                 candidate_score=self.candidate_feedback["Score"].iloc[0],
                 candidate_feedbacks=self.candidate_feedback["Feedback"].tolist(),
@@ -255,10 +508,40 @@ class GradioInterface:
 
         except Exception as e:
             self.logger.error(f"Error in process_submission: {str(e)}")
-            return ProcessingResult(
+            yield ProcessingResult(
                 error_message=f"An error occurred during processing: {str(e)}"
             )
 
+    def submit(
+        self,
+        video_path: str,
+        resume_path: str,
+        interview_questions: str,
+        job_title: str,
+        job_requirements: str,
+        grading_mode: str = GRADING_MODE,
+    ) -> Iterator[tuple]:
+        """
+        Gradio handler streaming the submission results to the outputs
+        """
+        for result in self.process_submission_stream(
+            video_path,
+            resume_path,
+            interview_questions,
+            job_title,
+            job_requirements,
+            grading_mode,
+        ):
+            yield (
+                result.candidate_name,
+                result.candidate_score,
+                result.candidate_feedbacks,
+                result.feedback_md,
+                result.interview_question,
+                result.job_requirements,
+                result.error_message,
+            )
+
     def save_report(
         self,
         candidate_name,
@@ -329,6 +612,14 @@ class GradioInterface:
                     placeholder="Enter the job requirements here...",
                 )
 
+            with gr.Row():
+                grading_mode_input = gr.Radio(
+                    choices=GRADING_MODES,
+                    value=GRADING_MODE,
+                    label="Grading Mode",
+                    info="one-pass grades & ranks in a single LLM call",
+                )
+
             submit_button = gr.Button("Analyze Interview", variant="primary")
 
             # Error message display
@@ -377,27 +668,14 @@ class GradioInterface:
 
             # Event handlers
             submit_button.click(
-                fn=lambda video, resume, questions, job_title, requirements: (
-                    lambda result: (
-                        result.candidate_name,
-                        result.candidate_score,
-                        result.candidate_feedbacks,
-                        result.feedback_md,
-                        result.interview_question,
-                        result.job_requirements,
-                        result.error_message,
-                    )
-                )(
-                    self.process_submission(
-                        video, resume, questions, job_title, requirements
-                    )
-                ),
+                fn=self.submit,
                 inputs=[
                     video_input,
                     resume_input,
                     question_input,
                     job_title_input,
                     requirements_input,
+                    grading_mode_input,
                 ],
                 outputs=[
                     candidate_name_state,
@@ -1,7 +1,8 @@
 """Base class for LLM providers"""
 
+import asyncio
 from abc import abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional
 
 
 class BaseLLMProvider:
@@ -14,3 +15,35 @@ class BaseLLMProvider:
     def complete(self, prompt: str = "") -> str:
         """LLM chat completion implementation by each provider"""
         raise NotImplementedError
+
+    @abstractmethod
+    def stream_complete(self, prompt: str = "") -> Iterator[str]:
+        """
+        LLM chat completion implementation by each provider, yielding the
+        generated text piece by piece as it arrives
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def acomplete(self, prompt: str = "") -> str:
+        """Async LLM chat completion implementation by each provider"""
+        raise NotImplementedError
+
+    async def acomplete_many(
+        self, prompts: List[str], max_concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        Runs the completions of many prompts concurrently on the running event
+        loop, with at most 'max_concurrency' requests in flight, and returns
+        them in the order of the prompts
+        """
+        if max_concurrency is None:
+            return list(await asyncio.gather(*map(self.acomplete, prompts)))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def acomplete_bounded(prompt: str) -> str:
+            async with semaphore:
+                return await self.acomplete(prompt)
+
+        return list(await asyncio.gather(*map(acomplete_bounded, prompts)))
@@ -0,0 +1,109 @@
+"""Completion cache for deterministic LLM providers"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.utils.cache import DiskCache, hash_bytes, make_key
+
+
+class CachedLLM(BaseLLMProvider):
+    def __init__(
+        self,
+        llm: BaseLLMProvider,
+        provider: str,
+        model: str,
+        temperature: float,
+        cache: DiskCache,
+        max_memory_entries: int = 256,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Wraps an LLM provider with a completion cache, keyed on the provider,
+        model, temperature and prompt hash. An in-memory LRU of at most
+        'max_memory_entries' completions sits in front of the persistent,
+        size-bounded 'cache', and completions expire after 'ttl' seconds.
+
+        Only a temperature of 0 makes completions deterministic, so with any
+        other temperature the cache is bypassed.
+        """
+
+        self._llm = llm
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+        self.enabled = temperature == 0
+        self._cache = cache
+        self._memory = OrderedDict()
+        self._max_memory_entries = max_memory_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str = "") -> str:
+        key, completion = self._lookup(prompt)
+        if completion is None:
+            completion = self._llm.complete(prompt)
+            self._store(key, completion)
+        return completion
+
+    def stream_complete(self, prompt: str = "") -> Iterator[str]:
+        key, completion = self._lookup(prompt)
+        if completion is not None:
+            yield completion
+            return
+
+        completion = ""
+        for delta in self._llm.stream_complete(prompt):
+            completion += delta
+            yield delta
+        # only reached once the whole completion was streamed
+        self._store(key, completion)
+
+    async def acomplete(self, prompt: str = "") -> str:
+        key, completion = self._lookup(prompt)
+        if completion is None:
+            completion = await self._llm.acomplete(prompt)
+            self._store(key, completion)
+        return completion
+
+    def _lookup(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        if not self.enabled:
+            return None, None
+
+        key = make_key(
+            self.provider, self.model, self.temperature, hash_bytes(prompt.encode())
+        )
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = self._cache.get(key)
+
+        if entry is None:
+            return key, None
+        completion, created = entry
+        if self._ttl is not None and time.time() - created > self._ttl:
+            with self._lock:
+                self._memory.pop(key, None)
+            self._cache.delete(key)
+            return key, None
+
+        self._remember(key, entry)
+        return key, completion
+
+    def _store(self, key: Optional[str], completion: str):
+        if key is None:
+            return
+        entry = (completion, time.time())
+        self._remember(key, entry)
+        self._cache.set(key, entry)
+
+    def _remember(self, key: str, entry: tuple):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_memory_entries:
+                self._memory.popitem(last=False)
@@ -1,3 +1,4 @@
 OPENAI_LLM = "openai"
 NVIDIA_LLM = "nvidia"
+HEDGED_LLM = "hedged"
 DEFAULT_LLM_API_BASE = "default"
@@ -0,0 +1,261 @@
+"""Composite provider hedging & failing over between LLM providers"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.scheduler import start_stream
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    def __init__(self, window: int = 100, smoothing: float = 0.2):
+        """
+        Latency & error statistics of a provider, over its last 'window'
+        successful calls
+        """
+
+        self.smoothing = smoothing
+        self.latencies = deque(maxlen=window)
+        self.ewma = None
+        self.successes = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_error_time = None
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.ewma = (
+                latency
+                if self.ewma is None
+                else self.smoothing * latency + (1 - self.smoothing) * self.ewma
+            )
+            self.successes += 1
+            self.consecutive_errors = 0
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+            self.consecutive_errors += 1
+            self.last_error_time = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.latencies:
+                return None
+            return float(np.percentile(self.latencies, q))
+
+    def to_dict(self) -> dict:
+        return {
+            "successes": self.successes,
+            "errors": self.errors,
+            "ewma_latency": self.ewma,
+            "p50_latency": self.percentile(50),
+            "p95_latency": self.percentile(95),
+        }
+
+
+class HedgedLLM(BaseLLMProvider):
+    def __init__(
+        self,
+        providers: Dict[str, BaseLLMProvider],
+        hedge_after: float = 10.0,
+        min_samples: int = 5,
+        max_consecutive_errors: int = 3,
+        cooldown: float = 60.0,
+        max_workers: int = 20,
+    ):
+        """
+        Sends each completion to the first of the ordered 'providers'. If it
+        has not answered within 'hedge_after' seconds, the same completion is
+        sent to the next provider, the first answer is used and the other
+        request is cancelled. A provider failing fails over to the next one
+        right away.
+
+        Latency & errors are tracked per provider to adapt the routing: once
+        every provider has 'min_samples' successful calls, they are tried from
+        the lowest average latency, and a provider with
+        'max_consecutive_errors' errors in a row is tried last for 'cooldown'
+        seconds.
+
+        The async acomplete cancels the losing request. Blocking calls cannot
+        be interrupted, so the loser of complete runs to the end in the
+        background, while the loser of stream_complete is closed.
+
+        Blocking calls run on a pool of 'max_workers' threads shared by all
+        callers, e.g. the sum of the MAX_CONNECTIONS of the providers, as
+        their schedulers would hold any extra call anyway. Time spent queued
+        for a thread counts neither toward 'hedge_after' nor in the latency.
+        """
+
+        if not providers:
+            raise ValueError("HedgedLLM needs at least one provider")
+
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cooldown = cooldown
+        self.stats = {name: LatencyStats() for name in providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def complete(self, prompt: str = "") -> str:
+        return self._hedge(lambda llm: llm.complete(prompt))
+
+    def stream_complete(self, prompt: str = "") -> Iterator[str]:
+        # hedged on the time to the first token, the winner streams the rest
+        first, stream = self._hedge(
+            lambda llm: start_stream(llm.stream_complete(prompt)),
+            on_cancel=lambda result: result[1].close(),
+        )
+        yield first
+        yield from stream
+
+    async def acomplete(self, prompt: str = "") -> str:
+        order = self.route()
+        tasks: Dict[asyncio.Task, str] = {}
+        last_error = None
+
+        async def timed_call(name: str) -> str:
+            start = time.monotonic()
+            try:
+                result = await self.providers[name].acomplete(prompt)
+            except Exception:
+                self.stats[name].record_error()
+                raise
+            self.stats[name].record_success(time.monotonic() - start)
+            return result
+
+        def start_next():
+            name = order.pop(0)
+            tasks[asyncio.create_task(timed_call(name))] = name
+
+        start_next()
+        try:
+            while tasks:
+                hedge = bool(order) and len(tasks) == 1
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=self.hedge_after if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info(f"Hedging {tasks[next(iter(tasks))]} with {order[0]}")
+                    start_next()
+                    continue
+                for task in done:
+                    name = tasks.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"{name} failed ({last_error}), failing over")
+                    if order and len(tasks) < 2:
+                        start_next()
+        finally:
+            for task in tasks:
+                task.cancel()
+        raise last_error
+
+    def route(self) -> List[str]:
+        """
+        Returns the names of the providers in the order to try them
+        """
+        names = list(self.providers)
+        if all(self.stats[n].successes >= self.min_samples for n in names):
+            names.sort(key=lambda n: self.stats[n].ewma)
+
+        now = time.monotonic()
+
+        def cooling_down(name: str) -> bool:
+            stats = self.stats[name]
+            return (
+                stats.consecutive_errors >= self.max_consecutive_errors
+                and now - stats.last_error_time < self.cooldown
+            )
+
+        return sorted(names, key=cooling_down)
+
+    def latency_stats(self) -> Dict[str, dict]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def close(self):
+        """
+        Shuts down the thread pool, letting the calls still running finish
+        """
+        self._executor.shutdown(wait=False)
+
+    def _hedge(
+        self,
+        call: Callable[[BaseLLMProvider], Any],
+        on_cancel: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        order = self.route()
+        futures: Dict[Future, str] = {}
+        # when each call started running, once it got a thread
+        starts: Dict[str, float] = {}
+        last_error = None
+
+        def timed_call(name: str) -> Any:
+            starts[name] = time.monotonic()
+            try:
+                result = call(self.providers[name])
+            except Exception:
+                self.stats[name].record_error()
+                raise
+            self.stats[name].record_success(time.monotonic() - starts[name])
+            return result
+
+        def start_next():
+            name = order.pop(0)
+            futures[self._executor.submit(timed_call, name)] = name
+
+        start_next()
+        try:
+            while futures:
+                hedge = bool(order) and len(futures) == 1
+                if hedge:
+                    running = futures[next(iter(futures))]
+                    elapsed = time.monotonic() - starts.get(running, time.monotonic())
+                done, _ = wait(
+                    futures,
+                    timeout=max(self.hedge_after - elapsed, 0) if hedge else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    # still queued for a thread, the hedge timer has not started
+                    if running not in starts:
+                        continue
+                    if time.monotonic() - starts[running] >= self.hedge_after:
+                        logger.info(f"Hedging {running} with {order[0]}")
+                        start_next()
+                    continue
+                for future in done:
+                    name = futures.pop(future)
+                    if future.exception() is None:
+                        return future.result()
+                    last_error = future.exception()
+                    logger.warning(f"{name} failed ({last_error}), failing over")
+                    if order and len(futures) < 2:
+                        start_next()
+        finally:
+            for future in futures:
+                # running calls cannot be cancelled, their result is discarded
+                if not future.cancel() and on_cancel is not None:
+                    future.add_done_callback(partial(_discard, on_cancel))
+        raise last_error
+
+
+def _discard(on_cancel: Callable[[Any], None], future: Future):
+    if future.exception() is None:
+        on_cancel(future.result())
@@ -1,32 +1,96 @@
 import yaml
+import httpx
+from pathlib import Path
+from typing import Optional
 
-from src.llm.enums import OPENAI_LLM, NVIDIA_LLM
+from src.llm.enums import OPENAI_LLM, NVIDIA_LLM, HEDGED_LLM
 from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.cached_llm import CachedLLM
+from src.llm.hedged_llm import HedgedLLM
 from src.llm.openai_llm import OpenAILLM
 from src.llm.nvidia_llm import NvidiaLLM
+from src.llm.registry import ProviderRegistry
+from src.llm.scheduler import INTERACTIVE, ScheduledLLM
+from src.utils.cache import DiskCache
 
 
-def get_llm(config_file_path: str = "config.yaml") -> BaseLLMProvider:
+# clients & connection pools shared by the whole process
+_registry = ProviderRegistry()
+
+
+def get_llm(
+    config_file_path: str = "config.yaml",
+    cache: Optional[DiskCache] = None,
+    cache_ttl: Optional[float] = None,
+    priority: int = INTERACTIVE,
+) -> BaseLLMProvider:
     """
-    Initiates LLM client from config file
+    Initiates LLM client from config file. Clients are shared by all callers
+    with the same config, and their calls are rate limited by the scheduler of
+    the provider at 'priority' (INTERACTIVE or BATCH). With a cache,
+    completions at temperature 0 are cached for 'cache_ttl' seconds.
     """
 
     # load config
     with open(config_file_path, "r") as f:
         config = yaml.safe_load(f)
 
-    # init & return llm
+    if config["PROVIDER"] == HEDGED_LLM:
+        # provider configs are relative to the hedged config
+        config_dir = Path(config_file_path).resolve().parent
+        # shared like the provider clients, keeping its threads & latency stats
+        return _registry.get_composite(
+            config,
+            lambda: HedgedLLM(
+                {
+                    path: get_llm(str(config_dir / path), cache, cache_ttl, priority)
+                    for path in config["PROVIDERS"]
+                },
+                hedge_after=config["HEDGE_AFTER"],
+                max_workers=config["MAX_CONNECTIONS"],
+            ),
+            str(config_dir),
+            cache.path if cache is not None else None,
+            cache_ttl,
+            priority,
+        )
+
+    llm = ScheduledLLM(
+        _registry.get(config, _init_llm), _registry.scheduler(config), priority
+    )
+    if cache is not None and config["TEMPERATURE"] == 0:
+        return CachedLLM(
+            llm,
+            provider=config["PROVIDER"],
+            model=config["MODEL"],
+            temperature=config["TEMPERATURE"],
+            cache=cache,
+            ttl=cache_ttl,
+        )
+    return llm
+
+
+def _init_llm(
+    config: dict, http_client: httpx.Client, async_http_client: httpx.AsyncClient
+) -> BaseLLMProvider:
+    # init & return llm, retries are left to the scheduler
     if config["PROVIDER"] == OPENAI_LLM:
         return OpenAILLM(
             model=config["MODEL"],
             temperature=config["TEMPERATURE"],
             base_url=config["BASE_URL"],
+            http_client=http_client,
+            async_http_client=async_http_client,
+            max_retries=0,
         )
     elif config["PROVIDER"] == NVIDIA_LLM:
         return NvidiaLLM(
             model=config["MODEL"],
             temperature=config["TEMPERATURE"],
             base_url=config["BASE_URL"],
+            http_client=http_client,
+            async_http_client=async_http_client,
+            max_retries=0,
         )
     else:
         raise ValueError(config["MODEL"])
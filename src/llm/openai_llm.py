@@ -1,5 +1,7 @@
 """OpenAI LLM Implementation"""
 
+import httpx
+from typing import Iterator, Optional
 from llama_index.llms.openai import OpenAI
 
 from src.llm.base_llm_provider import BaseLLMProvider
@@ -12,6 +14,9 @@ class OpenAILLM(BaseLLMProvider):
         model: str = "gpt-4o-mini",
         temperature: float = 0.0,
         base_url: str = DEFAULT_LLM_API_BASE,
+        http_client: Optional[httpx.Client] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 3,
     ):
         """Initiate OpenAI client"""
 
@@ -19,11 +24,26 @@ class OpenAILLM(BaseLLMProvider):
             self._client = OpenAI(
                 model=model,
                 temperature=temperature,
+                http_client=http_client,
+                async_http_client=async_http_client,
+                max_retries=max_retries,
             )
         else:
             self._client = OpenAI(
-                model=model, temperature=temperature, base_url=base_url
+                model=model,
+                temperature=temperature,
+                base_url=base_url,
+                http_client=http_client,
+                async_http_client=async_http_client,
+                max_retries=max_retries,
             )
 
     def complete(self, prompt: str = "") -> str:
         return str(self._client.complete(prompt))
+
+    def stream_complete(self, prompt: str = "") -> Iterator[str]:
+        for response in self._client.stream_complete(prompt):
+            yield response.delta or ""
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return str(await self._client.acomplete(prompt))
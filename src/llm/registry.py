@@ -0,0 +1,147 @@
+"""Process-wide registry of LLM provider clients"""
+
+import httpx
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.scheduler import LLMScheduler
+from src.utils.cache import make_key
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    def __init__(self, keepalive_expiry: float = 60.0):
+        """
+        Memoizes LLM provider clients by config, so that every caller with the
+        same config shares one client, and hands each provider keep-alive sync
+        & async HTTP connection pools shared by all its clients.
+
+        Each pool holds at most MAX_CONNECTIONS concurrent connections, as set in
+        the provider config, and keeps idle connections open for
+        'keepalive_expiry' seconds to skip repeated TLS handshakes.
+
+        Each provider also gets one scheduler, enforcing its
+        REQUESTS_PER_MINUTE & TOKENS_PER_MINUTE limits over all its clients.
+        """
+
+        self.keepalive_expiry = keepalive_expiry
+        self._providers: Dict[str, BaseLLMProvider] = {}
+        self._http_clients: Dict[Tuple[str, int], httpx.Client] = {}
+        self._async_http_clients: Dict[Tuple[str, int], httpx.AsyncClient] = {}
+        self._schedulers: Dict[str, LLMScheduler] = {}
+        # reentrant, as composite providers are built from other providers
+        self._lock = threading.RLock()
+
+    def get(
+        self,
+        config: dict,
+        factory: Callable[[dict, httpx.Client, httpx.AsyncClient], BaseLLMProvider],
+    ) -> BaseLLMProvider:
+        """
+        Returns the provider client of the config, built by
+        factory(config, http_client, async_http_client) the first time
+        """
+        key = make_key(config)
+        with self._lock:
+            if key not in self._providers:
+                http_client = self._get_http_client(
+                    config["PROVIDER"], config["MAX_CONNECTIONS"]
+                )
+                async_http_client = self._get_async_http_client(
+                    config["PROVIDER"], config["MAX_CONNECTIONS"]
+                )
+                self._providers[key] = factory(config, http_client, async_http_client)
+            return self._providers[key]
+
+    def get_composite(
+        self, config: dict, factory: Callable[[], BaseLLMProvider], *key_parts: Any
+    ) -> BaseLLMProvider:
+        """
+        Returns the composite provider (e.g. HedgedLLM) of the config and
+        'key_parts', built by factory() from other providers the first time
+        """
+        key = make_key(config, *key_parts)
+        with self._lock:
+            if key not in self._providers:
+                self._providers[key] = factory()
+            return self._providers[key]
+
+    def http_client(self, provider: str, max_connections: int) -> httpx.Client:
+        """
+        Returns the shared connection pool of the provider
+        """
+        with self._lock:
+            return self._get_http_client(provider, max_connections)
+
+    def scheduler(self, config: dict) -> LLMScheduler:
+        """
+        Returns the scheduler of the provider, created from the first config
+        of that provider
+        """
+        with self._lock:
+            if config["PROVIDER"] not in self._schedulers:
+                self._schedulers[config["PROVIDER"]] = LLMScheduler(
+                    requests_per_minute=config["REQUESTS_PER_MINUTE"],
+                    tokens_per_minute=config["TOKENS_PER_MINUTE"],
+                    max_concurrency=config["MAX_CONNECTIONS"],
+                )
+            return self._schedulers[config["PROVIDER"]]
+
+    def close(self):
+        """
+        Closes all connection pools & composite providers, and forgets the
+        memoized clients
+        """
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            for async_http_client in self._async_http_clients.values():
+                _close_async_client(async_http_client)
+            for provider in self._providers.values():
+                if hasattr(provider, "close"):
+                    provider.close()
+            self._http_clients.clear()
+            self._async_http_clients.clear()
+            self._providers.clear()
+            self._schedulers.clear()
+
+    def _get_http_client(self, provider: str, max_connections: int) -> httpx.Client:
+        key = (provider, max_connections)
+        if key not in self._http_clients:
+            self._http_clients[key] = httpx.Client(limits=self._limits(max_connections))
+        return self._http_clients[key]
+
+    def _get_async_http_client(
+        self, provider: str, max_connections: int
+    ) -> httpx.AsyncClient:
+        key = (provider, max_connections)
+        if key not in self._async_http_clients:
+            self._async_http_clients[key] = httpx.AsyncClient(
+                limits=self._limits(max_connections)
+            )
+        return self._async_http_clients[key]
+
+    def _limits(self, max_connections: int) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def _close_async_client(async_http_client: httpx.AsyncClient):
+    # on a thread of its own, as the caller may be running an event loop
+    def close():
+        try:
+            asyncio.run(async_http_client.aclose())
+        except Exception as e:
+            # connections opened on event loops that are already closed
+            logger.warning(f"Could not close async HTTP client cleanly: {e}")
+
+    thread = threading.Thread(target=close)
+    thread.start()
+    thread.join()
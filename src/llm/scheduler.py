@@ -0,0 +1,343 @@
+"""Client-side rate limiting & scheduling of LLM calls"""
+
+import math
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+import threading
+import httpx
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from src.llm.base_llm_provider import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+# priorities, lower goes first
+INTERACTIVE = 0
+BATCH = 1
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# connection failures & timeouts, e.g. httpx.ConnectError or ReadTimeout
+TRANSPORT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+# seconds between checks of a coroutine waiting for its turn
+_POLL_INTERVAL = 0.01
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: Optional[float], capacity: float):
+        """
+        Token bucket refilled at 'rate_per_minute', holding at most 'capacity'
+        tokens. Without a rate, it never runs out.
+        """
+
+        self.rate = rate_per_minute / 60 if rate_per_minute else None
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until 'amount' tokens are available, 0 if they already are
+        """
+        if self.rate is None:
+            return 0.0
+        self._refill()
+        # larger requests than the bucket would never fit, so they drain it
+        missing = min(amount, self.capacity) - self._tokens
+        return max(missing / self.rate, 0.0)
+
+    def consume(self, amount: float):
+        if self.rate is not None:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 10,
+        burst_seconds: float = 1.0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        """
+        Schedules the calls to one LLM provider. A call waits until it is the
+        most urgent one queued (INTERACTIVE before BATCH, then first come first
+        served), fewer than 'max_concurrency' calls are in flight, and the
+        request & token buckets allow it. Buckets hold 'burst_seconds' worth of
+        their per-minute rate.
+
+        Calls failing with a retryable HTTP status (e.g. 429), a connection
+        error or a timeout are retried up to 'max_retries' times, after the
+        delay asked by the Retry-After header if any, otherwise after a
+        jittered exponential backoff from 'base_delay' up to 'max_delay'
+        seconds.
+        """
+
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._requests = TokenBucket(
+            requests_per_minute,
+            (
+                max(requests_per_minute / 60 * burst_seconds, 1)
+                if requests_per_minute
+                else 0
+            ),
+        )
+        self._tokens = TokenBucket(
+            tokens_per_minute,
+            tokens_per_minute / 60 * burst_seconds if tokens_per_minute else 0,
+        )
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+    def run(
+        self, fn: Callable[[], Any], tokens: int = 0, priority: int = INTERACTIVE
+    ) -> Any:
+        """
+        Calls fn once scheduled, retrying it on rate limits & transient errors
+        """
+        for attempt in itertools.count():
+            self._acquire(tokens, priority)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f"LLM call failed ({e}), retrying in {delay:.1f}s")
+            finally:
+                self._release()
+            time.sleep(delay)
+
+    def stream(
+        self,
+        fn: Callable[[], Iterator[str]],
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+    ) -> Iterator[str]:
+        """
+        Streams fn() once scheduled, retrying it on rate limits & transient
+        errors until its first piece. The call holds its slot until the stream
+        is exhausted or closed.
+        """
+        for attempt in itertools.count():
+            self._acquire(tokens, priority)
+            started = False
+            try:
+                first, stream = start_stream(fn())
+                started = True
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f"LLM call failed ({e}), retrying in {delay:.1f}s")
+            finally:
+                if not started:
+                    self._release()
+            if started:
+                break
+            time.sleep(delay)
+
+        try:
+            yield first
+            yield from stream
+        finally:
+            self._release()
+
+    async def arun(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+    ) -> Any:
+        """
+        Awaits fn() once scheduled, retrying it on rate limits & transient
+        errors, without blocking the event loop
+        """
+        for attempt in itertools.count():
+            await self._aacquire(tokens, priority)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f"LLM call failed ({e}), retrying in {delay:.1f}s")
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    def _acquire(self, tokens: int, priority: int):
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    wait = self._try_acquire(entry, tokens)
+                    if wait == 0:
+                        return
+                    self._condition.wait(wait)
+            except BaseException:
+                self._dequeue(entry)
+                raise
+
+    async def _aacquire(self, tokens: int, priority: int):
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_acquire(entry, tokens)
+                if wait == 0:
+                    return
+                # polled, as threads can only notify other threads
+                await asyncio.sleep(_POLL_INTERVAL if wait is None else wait)
+        except BaseException:
+            with self._condition:
+                self._dequeue(entry)
+            raise
+
+    def _try_acquire(self, entry: tuple, tokens: int) -> Optional[float]:
+        """
+        Starts the call if it can run now and returns 0, otherwise returns how
+        long to wait for the buckets, None to wait for another call
+        """
+        if self._queue[0] != entry or self._in_flight >= self.max_concurrency:
+            return None
+        wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+        if wait > 0:
+            return wait
+
+        self._requests.consume(1)
+        self._tokens.consume(tokens)
+        heapq.heappop(self._queue)
+        self._in_flight += 1
+        # the next call in the queue may be able to start as well
+        self._condition.notify_all()
+        return 0
+
+    def _dequeue(self, entry: tuple):
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+        self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        if attempt >= self.max_retries or not _is_retryable(error):
+            return None
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.base_delay * 2**attempt, self.max_delay))
+
+
+class ScheduledLLM(BaseLLMProvider):
+    def __init__(
+        self,
+        llm: BaseLLMProvider,
+        scheduler: LLMScheduler,
+        priority: int = INTERACTIVE,
+        completion_tokens: int = 512,
+    ):
+        """
+        Wraps an LLM provider so that its calls go through the scheduler of
+        the provider at 'priority'. The tokens of a call are estimated from the
+        prompt (~4 characters per token) plus 'completion_tokens'.
+        """
+
+        self._llm = llm
+        self._scheduler = scheduler
+        self.priority = priority
+        self.completion_tokens = completion_tokens
+
+    def complete(self, prompt: str = "") -> str:
+        return self._scheduler.run(
+            lambda: self._llm.complete(prompt), self._tokens(prompt), self.priority
+        )
+
+    def stream_complete(self, prompt: str = "") -> Iterator[str]:
+        return self._scheduler.stream(
+            lambda: self._llm.stream_complete(prompt),
+            self._tokens(prompt),
+            self.priority,
+        )
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return await self._scheduler.arun(
+            lambda: self._llm.acomplete(prompt), self._tokens(prompt), self.priority
+        )
+
+    def _tokens(self, prompt: str) -> int:
+        return math.ceil(len(prompt) / 4) + self.completion_tokens
+
+
+def start_stream(stream: Iterator[str]) -> tuple[str, Iterator[str]]:
+    """
+    Waits for the first piece of a completion stream, so that errors are
+    raised before any text is handed out
+    """
+    return next(stream, ""), stream
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    # openai.APIStatusError & httpx.HTTPStatusError carry the HTTP response
+    response = getattr(error, "response", None)
+    return getattr(error, "status_code", None) or getattr(response, "status_code", None)
+
+
+def _is_transport_error(error: Exception) -> bool:
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    # openai.APIConnectionError & APITimeoutError carry the request but, never
+    # having reached the provider, no response
+    return (
+        getattr(error, "request", None) is not None
+        and getattr(error, "response", None) is None
+    )
+
+
+def _is_retryable(error: Exception) -> bool:
+    if _is_transport_error(error):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # an HTTP date
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,182 @@
+import time
+import logging
+import numpy as np
+import speech_recognition as sr
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from src.transcription.google_transcriber import GoogleTranscriber
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+@dataclass
+class AudioChunk:
+    start: float
+    end: float
+    audio: sr.AudioData
+
+
+@dataclass
+class TranscriptSegment:
+    start: float
+    end: float
+    text: str
+
+
+def split_on_silence(
+    audio: sr.AudioData,
+    frame_ms: int = 30,
+    min_silence_ms: int = 400,
+    min_chunk_s: float = 5.0,
+    max_chunk_s: float = 30.0,
+    silence_threshold: Optional[float] = None,
+) -> list[AudioChunk]:
+    """
+    Splits mono PCM audio into chunks at pauses in speech, with an energy based
+    voice activity detector.
+
+    The audio is framed in 'frame_ms' windows, and a frame is silent when its
+    RMS energy is below 'silence_threshold' (by default, twice the noise floor
+    estimated from the quietest frames). Chunks are cut in the middle of pauses
+    of at least 'min_silence_ms', short chunks are merged up to 'min_chunk_s',
+    and chunks without pauses are cut at their quietest frame to stay under
+    'max_chunk_s'. Chunks without any speech are dropped.
+    """
+    dtype = _SAMPLE_DTYPES[audio.sample_width]
+    samples = np.frombuffer(audio.frame_data, dtype=dtype).astype(np.float64)
+    frame_len = max(int(audio.sample_rate * frame_ms / 1000), 1)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return []
+
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    if silence_threshold is None:
+        # 1% of full scale is the floor for digital silence
+        silence_threshold = max(2 * np.percentile(rms, 10), 0.01 * np.iinfo(dtype).max)
+    silent = rms < silence_threshold
+
+    # cut points in the middle of every long enough pause, in frames
+    min_silence = max(int(min_silence_ms / frame_ms), 1)
+    cuts = [0]
+    run_start = None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_silence and 0 < run_start and i < n_frames:
+                cuts.append((run_start + i) // 2)
+            run_start = None
+    cuts.append(n_frames)
+
+    frame_s = frame_len / audio.sample_rate
+    min_frames = int(min_chunk_s / frame_s)
+    max_frames = max(int(max_chunk_s / frame_s), 1)
+
+    bounds = []
+    start = 0
+    for cut in cuts[1:]:
+        if cut - start < min_frames and cut != n_frames:
+            continue
+        # chunks without pauses are cut where the energy is lowest
+        while cut - start > max_frames:
+            window = rms[start + max_frames // 2 : start + max_frames]
+            split = start + max_frames // 2 + int(np.argmin(window))
+            bounds.append((start, split))
+            start = split
+        bounds.append((start, cut))
+        start = cut
+
+    byte_len = frame_len * audio.sample_width
+    chunks = []
+    for first, last in bounds:
+        if silent[first:last].all():
+            continue
+        # the trailing samples that do not fill a frame go to the last chunk
+        end_byte = len(audio.frame_data) if last == n_frames else last * byte_len
+        chunks.append(
+            AudioChunk(
+                start=first * frame_s,
+                end=end_byte / audio.sample_width / audio.sample_rate,
+                audio=sr.AudioData(
+                    audio.frame_data[first * byte_len : end_byte],
+                    audio.sample_rate,
+                    audio.sample_width,
+                ),
+            )
+        )
+    return chunks
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes long audio by splitting it at silences (split_on_silence) and
+    sending the chunks concurrently to the speech recognizer, on at most
+    'max_workers' threads. The texts are stitched back together in order.
+
+    'recognize' is typically the transcribe method of a backend built by
+    get_transcriber(), and defaults to Google's Web Speech API.
+
+    A chunk the recognizer fails on is retried on its own, up to 'max_retries'
+    times with an exponential backoff, and a chunk without any recognisable
+    speech is transcribed as an empty string.
+    """
+
+    def __init__(
+        self,
+        recognize: Optional[Callable[[sr.AudioData], str]] = None,
+        max_workers: int = 4,
+        max_retries: int = 2,
+        retry_delay: float = 1.0,
+        **split_kwargs,
+    ):
+        self.recognize = recognize or GoogleTranscriber().transcribe
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.split_kwargs = split_kwargs
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        """
+        Returns the transcript of the whole audio
+        """
+        segments = self.transcribe_segments(audio)
+        return " ".join(segment.text for segment in segments if segment.text)
+
+    def transcribe_segments(self, audio: sr.AudioData) -> list[TranscriptSegment]:
+        """
+        Returns the transcript of each chunk of speech, with its start and end
+        time in seconds, in order
+        """
+        chunks = split_on_silence(audio, **self.split_kwargs)
+        if not chunks:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(chunks))
+        ) as executor:
+            texts = list(executor.map(self._recognize_chunk, chunks))
+
+        return [
+            TranscriptSegment(start=chunk.start, end=chunk.end, text=text)
+            for chunk, text in zip(chunks, texts)
+        ]
+
+    def _recognize_chunk(self, chunk: AudioChunk) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.recognize(chunk.audio)
+            except sr.UnknownValueError:
+                return ""
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    f"Transcription of chunk [{chunk.start:.1f}s, {chunk.end:.1f}s] "
+                    f"failed ({e}), retrying"
+                )
+                time.sleep(self.retry_delay * 2**attempt)
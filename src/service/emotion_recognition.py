@@ -1,17 +1,69 @@
 import numpy as np
+import cv2
+from itertools import islice
+from typing import Callable, Iterable, Optional
 from deepface import DeepFace
+from deepface.modules import modeling, preprocessing
+from deepface.models.demography.Emotion import labels as EMOTION_MODEL_LABELS
 
 from src.domain.enums.emotion_types import EmotionType
+from src.service.face_tracker import FaceTracker
+
+# column order of emotion matrices
+EMOTION_COLUMNS = list(EmotionType)
+
+# custom weightage of each emotion in the confidence score
+DEFAULT_EMOTION_WEIGHTS = {
+    EmotionType.SAD: 1.3,
+    EmotionType.FEAR: 1.3,
+    EmotionType.ANGRY: 1.3,
+    EmotionType.DISGUST: 10,
+    EmotionType.HAPPY: 1.7,
+    EmotionType.NEUTRAL: 1 / 1.2,
+    EmotionType.SURPRISE: 1.4,
+}
 
 
 class EmotionRecognition:
+    # DeepFace emotion model, loaded once per process
+    _emotion_model = None
+
     def __init__(self):
         pass
 
     @classmethod
-    def detect_face_emotions(cls, frames: list[np.ndarray] = None) -> list:
+    def load_model(cls):
+        """
+        Loads the DeepFace emotion model, keeping it resident for the lifetime
+        of the process
+        """
+        if cls._emotion_model is None:
+            cls._emotion_model = modeling.build_model(
+                task="facial_attribute", model_name="Emotion"
+            )
+        return cls._emotion_model
+
+    @classmethod
+    def warm_up(cls, batch_size: int = 32, detector_backend: str = "opencv"):
+        """
+        Loads the emotion model and face detector, and runs a dummy batch
+        through them so that the first request does not pay for it
+        """
+        cls.load_model()
+        dummy_frame = np.zeros((224, 224, 3), dtype=np.uint8)
+        cls.detect_face_emotions_batched(
+            [dummy_frame] * batch_size,
+            batch_size=batch_size,
+            detector_backend=detector_backend,
+        )
+
+    @classmethod
+    def detect_face_emotions(cls, frames: Iterable[np.ndarray] = None) -> list:
         """
-        Performs facial emotion detection using the DeepFace model
+        Performs facial emotion detection using the DeepFace model.
+
+        Frames may be a list or a lazy iterator such as iter_frames(), in which
+        case each frame is released as soon as it has been analysed.
         """
         emotions = []
         for frame in frames:
@@ -23,114 +75,355 @@ class EmotionRecognition:
         return emotions
 
     @classmethod
-    def process_emotions(cls, emotions: list) -> dict:
+    def detect_face_emotions_batched(
+        cls,
+        frames: Iterable[np.ndarray] = None,
+        batch_size: int = 32,
+        detector_backend: str = "opencv",
+        on_batch: Optional[Callable[[list], Optional[bool]]] = None,
+    ) -> list:
+        """
+        Performs facial emotion detection like detect_face_emotions(), but
+        classifies the faces of 'batch_size' frames in a single forward pass
+        of the resident emotion model.
+
+        Returns one list of face results per frame, in the same format as
+        DeepFace.analyze(). If given, 'on_batch' is called with the results of
+        every batch as soon as they are available, e.g. to update an
+        EmotionScoreAccumulator, and may return True to stop early.
+        """
+        return cls._analyze_batches(
+            frames,
+            batch_size,
+            lambda frame: DeepFace.extract_faces(
+                frame, detector_backend=detector_backend, enforce_detection=False
+            ),
+            on_batch,
+        )
+
+    @classmethod
+    def detect_face_emotions_tracked(
+        cls,
+        frames: Iterable[np.ndarray] = None,
+        batch_size: int = 32,
+        tracker: Optional[FaceTracker] = None,
+        on_batch: Optional[Callable[[list], Optional[bool]]] = None,
+    ) -> list:
+        """
+        Performs batched facial emotion detection like
+        detect_face_emotions_batched(), but only runs the face detector on
+        keyframes and follows the face through the other frames with a
+        FaceTracker. Only the tracked face crop is classified on those frames.
+        """
+        tracker = tracker or FaceTracker()
+        return cls._analyze_batches(frames, batch_size, tracker.extract_faces, on_batch)
+
+    @classmethod
+    def _analyze_batches(
+        cls,
+        frames: Iterable[np.ndarray],
+        batch_size: int,
+        extract_faces: Callable[[np.ndarray], list[dict]],
+        on_batch: Optional[Callable[[list], Optional[bool]]] = None,
+    ) -> list:
+        emotions = []
+        frames = iter(frames)
+        while batch := list(islice(frames, batch_size)):
+            results = cls._analyze_batch(batch, extract_faces)
+            emotions.extend(results)
+            if on_batch is not None and on_batch(results):
+                break
+
+        return emotions
+
+    @classmethod
+    def _analyze_batch(
+        cls,
+        frames: list[np.ndarray],
+        extract_faces: Callable[[np.ndarray], list[dict]],
+    ) -> list:
+        faces, face_objs = [], []
+        results = [[] for _ in frames]
+        for index, frame in enumerate(frames):
+            for face_obj in extract_faces(frame):
+                face = face_obj["face"]
+                if face.shape[0] == 0 or face.shape[1] == 0:
+                    continue
+                faces.append(cls._preprocess_face(face))
+                face_objs.append((index, face_obj))
+
+        if not faces:
+            return results
+
+        predictions = cls.classify_faces(np.stack(faces))
+        for (index, face_obj), prediction in zip(face_objs, predictions):
+            results[index].append(cls._format_prediction(prediction, face_obj))
+
+        return results
+
+    @classmethod
+    def classify_faces(cls, faces: np.ndarray) -> np.ndarray:
+        """
+        Runs a batch of preprocessed 48x48 grayscale faces through the emotion
+        model in a single forward pass, and returns the raw predictions
+        """
+        return cls.load_model().model(faces, training=False).numpy()
+
+    @classmethod
+    def _preprocess_face(cls, face: np.ndarray) -> np.ndarray:
+        """
+        Converts an extracted RGB face into the 48x48 grayscale input of the
+        emotion model, following the same steps as DeepFace.analyze()
+        """
+        face = preprocessing.resize_image(img=face[:, :, ::-1], target_size=(224, 224))
+        face = cv2.cvtColor(face[0], cv2.COLOR_BGR2GRAY)
+        return cv2.resize(face, (48, 48))
+
+    @classmethod
+    def _format_prediction(cls, prediction: np.ndarray, face_obj: dict) -> dict:
+        sum_of_predictions = prediction.sum()
+        return {
+            "emotion": {
+                label: 100 * prediction[i] / sum_of_predictions
+                for i, label in enumerate(EMOTION_MODEL_LABELS)
+            },
+            "dominant_emotion": EMOTION_MODEL_LABELS[np.argmax(prediction)],
+            "region": face_obj["facial_area"],
+            "face_confidence": face_obj["confidence"],
+        }
+
+    @classmethod
+    def process_emotions(
+        cls,
+        emotions: list,
+        weights: Optional[list[float]] = None,
+        emotion_weights: Optional[dict[EmotionType, float]] = None,
+    ) -> dict:
         """
         Processes the emotions by calculating the overall confidence score using a
         custom weighted emotion balancing algorithm.
 
+        If 'weights' is given, each frame counts in proportion to its weight,
+        e.g. the time span it stands for after adaptive frame selection.
+        'emotion_weights' overrides the weightage of each emotion, defaulting to
+        DEFAULT_EMOTION_WEIGHTS.
+
         Returns:
         - weighted normalized score
         - signed, weighted normalized score
         - confidence score
+        - confidence score timeline, one value per second of video (or per
+          frame if no weights are given), NaN where no face was detected
         """
+        matrix, has_face = cls.to_emotion_matrix(emotions)
+        return cls.process_emotion_matrix(matrix, has_face, weights, emotion_weights)
 
-        count = 0
-        emots = {
-            str(EmotionType.SAD.value): 0,
-            str(EmotionType.FEAR.value): 0,
-            str(EmotionType.ANGRY.value): 0,
-            str(EmotionType.DISGUST.value): 0,
-            str(EmotionType.HAPPY.value): 0,
-            str(EmotionType.NEUTRAL.value): 0,
-            str(EmotionType.SURPRISE.value): 0,
-        }
-
-        for frame_result in emotions:
+    @classmethod
+    def to_emotion_matrix(cls, emotions: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Converts DeepFace frame results into a (n_frames x 7) matrix of emotion
+        percentages, with columns in EMOTION_COLUMNS order, and a mask of the
+        frames in which a face was detected.
+        """
+        matrix = np.zeros((len(emotions), len(EMOTION_COLUMNS)))
+        has_face = np.zeros(len(emotions), dtype=bool)
+        for i, frame_result in enumerate(emotions):
             if len(frame_result) > 0:
                 emot = frame_result[0]["emotion"]
-                emots[str(EmotionType.SAD.value)] = (
-                    emots.get(str(EmotionType.SAD.value), 0)
-                    + emot[str(EmotionType.SAD.value)]
-                )
-                emots[str(EmotionType.FEAR.value)] = (
-                    emots.get(str(EmotionType.FEAR.value), 0)
-                    + emot[str(EmotionType.FEAR.value)]
-                )
-                emots[str(EmotionType.ANGRY.value)] = (
-                    emots.get(str(EmotionType.ANGRY.value), 0)
-                    + emot[str(EmotionType.ANGRY.value)]
-                )
-                emots[str(EmotionType.DISGUST.value)] = (
-                    emots.get(str(EmotionType.DISGUST.value), 0)
-                    + emot[str(EmotionType.DISGUST.value)]
-                )
-                emots[str(EmotionType.HAPPY.value)] = (
-                    emots.get(str(EmotionType.HAPPY.value), 0)
-                    + emot[str(EmotionType.HAPPY.value)]
-                )
-                emots[str(EmotionType.NEUTRAL.value)] = (
-                    emots.get(str(EmotionType.NEUTRAL.value), 0)
-                    + emot[str(EmotionType.NEUTRAL.value)]
-                )
-                emots[str(EmotionType.SURPRISE.value)] = (
-                    emots.get(str(EmotionType.SURPRISE.value), 0)
-                    + emot[str(EmotionType.SURPRISE.value)]
-                )
-                count += 1
-
-        # prevent zero division
-        if count == 0:
-            count = 1
-
-        for i in list(emots.keys()):
-            emots[i] /= count * 100
-
-        # refactor according to custom weightage
-        sad_score = emots[str(EmotionType.SAD.value)] * 1.3
-        fear_score = emots[str(EmotionType.FEAR.value)] * 1.3
-        angry_score = emots[str(EmotionType.ANGRY.value)] * 1.3
-        disgust_score = emots[str(EmotionType.DISGUST.value)] * 10
-        happy_score = emots[str(EmotionType.HAPPY.value)] * 1.7
-        neutral_score = emots[str(EmotionType.NEUTRAL.value)] / 1.2
-        surprise_score = emots[str(EmotionType.SURPRISE.value)] * 1.4
-
-        score_list = [
-            sad_score,
-            angry_score,
-            surprise_score,
-            fear_score,
-            happy_score,
-            disgust_score,
-            neutral_score,
-        ]
-        normalized_scores = cls.__normalize_scores(score_list)
-        mean = np.mean(normalized_scores)
-
-        result_scores = [
-            (-sad_score),
-            (-angry_score),
-            surprise_score,
-            (-fear_score),
-            happy_score,
-            (-disgust_score),
-            neutral_score,
-        ]
-        normalized_result_scores = cls.__normalize_scores(result_scores)
-        result = np.mean(normalized_result_scores)
-
-        difference = abs((mean - result) / mean) * 100
+                matrix[i] = [emot[emotion.value] for emotion in EMOTION_COLUMNS]
+                has_face[i] = True
+
+        return matrix, has_face
+
+    @classmethod
+    def process_emotion_matrix(
+        cls,
+        matrix: np.ndarray,
+        has_face: Optional[np.ndarray] = None,
+        weights: Optional[list[float]] = None,
+        emotion_weights: Optional[dict[EmotionType, float]] = None,
+    ) -> dict:
+        """
+        Same as process_emotions(), on an emotion matrix from
+        to_emotion_matrix(). Useful to re-score stored frame results, e.g.
+        when tuning the emotion weights, without re-running DeepFace.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        n_frames = len(matrix)
+        if has_face is None:
+            has_face = np.ones(n_frames, dtype=bool)
+        spans = np.ones(n_frames) if weights is None else np.asarray(weights, float)
+        # frames without a face count for nothing
+        frame_weights = np.where(has_face, spans, 0.0)
+
+        if not frame_weights.any():
+            raise ValueError("No face detected in any of the frames")
+
+        total_weight = frame_weights.sum()
+        averages = frame_weights @ matrix / (total_weight * 100)
+        mean, result, conf = cls._score(averages, emotion_weights)
+
+        return {
+            "mean": mean,
+            "result": result,
+            "conf": conf,
+            "timeline": cls._timeline(matrix, frame_weights, spans, emotion_weights),
+        }
+
+    @classmethod
+    def _timeline(
+        cls,
+        matrix: np.ndarray,
+        frame_weights: np.ndarray,
+        spans: np.ndarray,
+        emotion_weights: Optional[dict[EmotionType, float]] = None,
+    ) -> np.ndarray:
+        """
+        Computes the confidence score of every second of video. Frames are
+        assumed to cover back-to-back spans, so per-second emotion averages
+        are differences of the cumulative integral of the emotions over time.
+        """
+        if len(matrix) == 0:
+            return np.array([])
+
+        breakpoints = np.concatenate([[0], np.cumsum(spans)])
+        seconds = np.arange(int(np.ceil(breakpoints[-1])) + 1)
+        seconds = np.minimum(seconds, breakpoints[-1])
+
+        emotion_integral = np.vstack(
+            [np.zeros(matrix.shape[1]), np.cumsum(matrix * frame_weights[:, None], 0)]
+        )
+        weight_integral = np.concatenate([[0], np.cumsum(frame_weights)])
+
+        emotion_sums = np.diff(
+            np.column_stack(
+                [
+                    np.interp(seconds, breakpoints, emotion_integral[:, j])
+                    for j in range(matrix.shape[1])
+                ]
+            ),
+            axis=0,
+        )
+        weight_sums = np.diff(np.interp(seconds, breakpoints, weight_integral))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            averages = emotion_sums / (weight_sums[:, None] * 100)
+            _, _, conf = cls._score(averages, emotion_weights)
+
+        return np.where(weight_sums > 0, conf, np.nan)
+
+    @classmethod
+    def _score(
+        cls,
+        averages: np.ndarray,
+        emotion_weights: Optional[dict[EmotionType, float]] = None,
+    ) -> tuple:
+        """
+        Scores averaged emotions (either one row of 7, or one row per time
+        step) with the custom weightage, and returns the weighted normalized
+        score, the signed weighted normalized score, and the confidence score.
+        """
+        emotion_weights = {**DEFAULT_EMOTION_WEIGHTS, **(emotion_weights or {})}
+        weight_vector = np.array([emotion_weights[e] for e in EMOTION_COLUMNS])
+        sign_vector = np.array(
+            [
+                -1 if e in EmotionType.get_negative_emotions() else 1
+                for e in EMOTION_COLUMNS
+            ]
+        )
+
+        scores = averages * weight_vector
+        mean = np.mean(cls.__normalize_scores(scores), axis=-1)
+        result = np.mean(cls.__normalize_scores(scores * sign_vector), axis=-1)
+
+        difference = np.abs((mean - result) / mean) * 100
 
         # keep values in range of [0, 100]
-        difference = min(difference, 50)
+        difference = np.minimum(difference, 50)
+        conf = np.where(mean > result, 50 - difference, 50 + difference)
+
+        if np.ndim(conf) == 0:
+            return float(mean), float(result), float(conf)
+        return mean, result, conf
+
+    @classmethod
+    def __normalize_scores(cls, scores) -> np.ndarray:
+        scores = np.asarray(scores, dtype=float)
+        min_val = scores.min(axis=-1, keepdims=True)
+        max_val = scores.max(axis=-1, keepdims=True)
+        return (scores - min_val) / (max_val - min_val)
+
 
-        if mean > result:
-            conf = 50 - difference
+class EmotionScoreAccumulator:
+    """
+    Incrementally computes the confidence score of
+    EmotionRecognition.process_emotions() from frame results fed one at a
+    time or in batches, in constant memory.
+
+    The score is considered converged once it moved by at most 'tolerance'
+    points over 'patience' consecutive updates.
+    """
+
+    def __init__(
+        self,
+        emotion_weights: Optional[dict[EmotionType, float]] = None,
+        tolerance: float = 0.5,
+        patience: int = 3,
+    ):
+        self.emotion_weights = emotion_weights
+        self.tolerance = tolerance
+        self.patience = patience
+
+        self.n_frames = 0
+        self._emotion_sums = np.zeros(len(EMOTION_COLUMNS))
+        self._total_weight = 0.0
+        self._score = None
+        self._stable_updates = 0
+
+    def update(
+        self, emotions: list, weights: Optional[list[float]] = None
+    ) -> Optional[float]:
+        """
+        Adds frame results, optionally weighted like in process_emotions(), and
+        returns the current confidence score (None until a face was detected).
+        """
+        matrix, has_face = EmotionRecognition.to_emotion_matrix(emotions)
+        spans = np.ones(len(matrix)) if weights is None else np.asarray(weights, float)
+        frame_weights = np.where(has_face, spans, 0.0)
+
+        self.n_frames += len(matrix)
+        self._emotion_sums += frame_weights @ matrix
+        self._total_weight += frame_weights.sum()
+
+        previous_conf = self.conf
+        if self._total_weight > 0:
+            averages = self._emotion_sums / (self._total_weight * 100)
+            self._score = EmotionRecognition._score(averages, self.emotion_weights)
+
+        if previous_conf is not None and abs(self.conf - previous_conf) <= (
+            self.tolerance
+        ):
+            self._stable_updates += 1
         else:
-            conf = 50 + difference
+            self._stable_updates = 0
 
-        return {"mean": mean, "result": result, "conf": conf}
+        return self.conf
 
-    @classmethod
-    def __normalize_scores(cls, scores: list) -> list:
-        min_val, max_val = min(scores), max(scores)
-        return [(score - min_val) / (max_val - min_val) for score in scores]
+    @property
+    def conf(self) -> Optional[float]:
+        return None if self._score is None else self._score[2]
+
+    @property
+    def converged(self) -> bool:
+        return self._stable_updates >= self.patience
+
+    def result(self) -> dict:
+        """
+        Returns the scores of all frames so far, in the same format as
+        process_emotions() (without the timeline)
+        """
+        if self._score is None:
+            raise ValueError("No face detected in any of the frames")
+
+        mean, result, conf = self._score
+        return {"mean": mean, "result": result, "conf": conf}
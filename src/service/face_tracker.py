@@ -0,0 +1,149 @@
+import cv2
+import numpy as np
+from typing import Optional
+from deepface import DeepFace
+
+
+class FaceTracker:
+    """
+    Follows the interviewee's face across consecutive frames, so the face
+    detector only has to run on keyframes.
+
+    The face is detected on a keyframe, then located in the following frames
+    by template matching around its last position. The detector is run again
+    when the match score drops below 'min_score', or after 'redetect_interval'
+    tracked frames.
+    """
+
+    def __init__(
+        self,
+        detector_backend: str = "opencv",
+        redetect_interval: int = 30,
+        min_score: float = 0.6,
+        search_margin: float = 0.5,
+    ):
+        self.detector_backend = detector_backend
+        self.redetect_interval = redetect_interval
+        self.min_score = min_score
+        self.search_margin = search_margin
+
+        self.n_detected = 0
+        self.n_tracked = 0
+
+        self._template = None
+        self._area = None
+        self._confidence = None
+        self._frames_since_detection = 0
+
+    def extract_faces(self, frame: np.ndarray) -> list[dict]:
+        """
+        Returns the faces of the frame in the same format as
+        DeepFace.extract_faces(), either tracked or freshly detected. The
+        tracked face always comes first, so that [0] is the same person
+        across frames.
+        """
+        if (
+            self._template is not None
+            and self._frames_since_detection < self.redetect_interval
+        ):
+            face_obj = self._track(frame)
+            if face_obj is not None:
+                self.n_tracked += 1
+                self._frames_since_detection += 1
+                return [face_obj]
+
+        return self._detect(frame)
+
+    def reset(self):
+        self._template = None
+        self._area = None
+        self._confidence = None
+        self._frames_since_detection = 0
+
+    def _detect(self, frame: np.ndarray) -> list[dict]:
+        self.n_detected += 1
+        last_area = self._area
+        self.reset()
+
+        face_objs = DeepFace.extract_faces(
+            frame, detector_backend=self.detector_backend, enforce_detection=False
+        )
+        # no face found, DeepFace returns the whole frame with zero confidence
+        detected = [face_obj for face_obj in face_objs if face_obj["confidence"] > 0]
+        if not detected:
+            return face_objs
+
+        # the face overlapping the last tracked one the most, else the largest
+        primary = max(
+            detected,
+            key=lambda f: (
+                self._overlap(self._to_area(f), last_area) if last_area else 0,
+                f["facial_area"]["w"] * f["facial_area"]["h"],
+            ),
+        )
+        self._area = self._to_area(primary)
+        self._template = self._to_gray(self._crop(frame, self._area))
+        self._confidence = primary["confidence"]
+
+        return [primary] + [f for f in face_objs if f is not primary]
+
+    def _track(self, frame: np.ndarray) -> Optional[dict]:
+        x, y, w, h = self._area
+        frame_h, frame_w = frame.shape[:2]
+        margin_x, margin_y = int(w * self.search_margin), int(h * self.search_margin)
+        left, top = max(x - margin_x, 0), max(y - margin_y, 0)
+        right = min(x + w + margin_x, frame_w)
+        bottom = min(y + h + margin_y, frame_h)
+        if right - left < w or bottom - top < h:
+            return None
+
+        window = self._to_gray(frame[top:bottom, left:right])
+        scores = cv2.matchTemplate(window, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+        # also rejects NaN scores on flat windows
+        if not score >= self.min_score:
+            return None
+
+        self._area = (left + match_x, top + match_y, w, h)
+        face = self._crop(frame, self._area)
+        return {
+            # same orientation & scale as DeepFace.extract_faces() output
+            "face": face[:, :, ::-1].astype(np.float32) / 255,
+            "facial_area": {
+                "x": self._area[0],
+                "y": self._area[1],
+                "w": w,
+                "h": h,
+                "left_eye": None,
+                "right_eye": None,
+            },
+            "confidence": self._confidence,
+        }
+
+    @staticmethod
+    def _to_area(face_obj: dict) -> tuple:
+        area = face_obj["facial_area"]
+        return (area["x"], area["y"], area["w"], area["h"])
+
+    @staticmethod
+    def _overlap(area: tuple, other: tuple) -> float:
+        """
+        Intersection over union of two (x, y, w, h) areas
+        """
+        x, y, w, h = area
+        other_x, other_y, other_w, other_h = other
+        inter_w = min(x + w, other_x + other_w) - max(x, other_x)
+        inter_h = min(y + h, other_y + other_h) - max(y, other_y)
+        if inter_w <= 0 or inter_h <= 0:
+            return 0.0
+        intersection = inter_w * inter_h
+        return intersection / (w * h + other_w * other_h - intersection)
+
+    @staticmethod
+    def _crop(frame: np.ndarray, area: tuple) -> np.ndarray:
+        x, y, w, h = area
+        return frame[y : y + h, x : x + w]
+
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
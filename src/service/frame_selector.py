@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from typing import Iterable, Iterator, Optional
+
+
+class AdaptiveFrameSelector:
+    """
+    Drops near-duplicate frames of a (mostly static) talking head before they
+    reach emotion analysis.
+
+    Candidate frames are expected at 'max_fps', e.g. iter_frames(target_fps=
+    max_fps), unless select() is given the rate they are actually sampled at,
+    e.g. sampled_fps() when the source video is slower than 'max_fps'. Each
+    one is scored by the mean absolute difference between its downscaled
+    luminance and that of the last kept frame, and is only kept if the score
+    reaches 'threshold', or if no frame was kept for 1 / 'min_fps' seconds.
+
+    After iteration, 'weights' holds the number of seconds of video each kept
+    frame stands for, to be passed to EmotionRecognition.process_emotions().
+    """
+
+    def __init__(
+        self,
+        min_fps: float = 0.5,
+        max_fps: float = 2.0,
+        threshold: float = 6.0,
+        thumbnail_size: int = 32,
+    ):
+        if min_fps <= 0 or max_fps < min_fps:
+            raise ValueError(f"Invalid fps range: [{min_fps}, {max_fps}]")
+
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+
+        self.timestamps = []
+        self.weights = []
+        self.n_candidates = 0
+
+    def select(
+        self, frames: Iterable[np.ndarray], fps: Optional[float] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Yields the frames that changed meaningfully since the last kept frame,
+        'fps' being the rate of the candidate frames, 'max_fps' by default
+        """
+        fps = fps or self.max_fps
+        self.timestamps, self.weights, self.n_candidates = [], [], 0
+        last_thumbnail = None
+        max_gap = 1 / self.min_fps
+
+        for index, frame in enumerate(frames):
+            self.n_candidates += 1
+            timestamp = index / fps
+            thumbnail = self._thumbnail(frame)
+
+            if (
+                last_thumbnail is None
+                or timestamp - self.timestamps[-1] >= max_gap - 1e-9
+                or self.score(thumbnail, last_thumbnail) >= self.threshold
+            ):
+                if self.timestamps:
+                    self.weights.append(timestamp - self.timestamps[-1])
+                self.timestamps.append(timestamp)
+                last_thumbnail = thumbnail
+                yield frame
+
+        # the last kept frame stands for the rest of the video
+        if self.timestamps:
+            end = self.n_candidates / fps
+            self.weights.append(end - self.timestamps[-1])
+
+    @staticmethod
+    def score(thumbnail: np.ndarray, reference: np.ndarray) -> float:
+        """
+        Mean absolute luminance difference between two thumbnails, in [0, 255]
+        """
+        return float(cv2.absdiff(thumbnail, reference).mean())
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        return cv2.resize(
+            gray,
+            (self.thumbnail_size, self.thumbnail_size),
+            interpolation=cv2.INTER_AREA,
+        )
@@ -0,0 +1,178 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.template.grading_prompt import (
+    GRADE_AND_RANK_PROMPT,
+    GRADE_RESPONSE_PROMPT,
+    RANKING_AND_FEEDBACK_PROMPT,
+)
+from src.utils.utils import parse_yaml_string
+
+logger = logging.getLogger(__name__)
+
+# grading modes
+TWO_PASS = "two-pass"
+ONE_PASS = "one-pass"
+GRADING_MODES = [TWO_PASS, ONE_PASS]
+
+GRADE_DIMENSIONS = [
+    "answer_quality",
+    "problem_solving",
+    "confidence",
+    "personality",
+    "overall_performance",
+]
+
+
+@dataclass
+class GradingProgress:
+    # text generated so far by the grading, then the ranking completion
+    grade: str = ""
+    rank_and_feedback: Optional[str] = None
+    # parsed name, score & feedback, once the last completion has ended
+    result: Optional[dict] = None
+
+
+class InterviewGrader:
+    """
+    Grades an interview response and ranks the candidate against the job with
+    an LLM, in one of the GRADING_MODES:
+
+    - TWO_PASS: GRADE_RESPONSE_PROMPT grades the response in free text, then
+      RANKING_AND_FEEDBACK_PROMPT ranks the candidate from that grade.
+    - ONE_PASS: GRADE_AND_RANK_PROMPT returns the grade of each of the
+      GRADE_DIMENSIONS and the ranking in a single completion, halving the
+      round trips and not sending the grade back as input tokens.
+
+    Both return the name, score & feedback parsed from the YAML output, plus
+    the per-dimension grades in ONE_PASS.
+    """
+
+    def __init__(self, llm: BaseLLMProvider):
+        self.llm = llm
+
+    def grade(
+        self,
+        interview_question: str,
+        conf_score: str,
+        response_text: str,
+        job_requirements: str,
+        resume_text: str,
+        mode: str = TWO_PASS,
+    ) -> dict:
+        for progress in self.stream_grade(
+            interview_question,
+            conf_score,
+            response_text,
+            job_requirements,
+            resume_text,
+            mode,
+        ):
+            pass
+        return progress.result
+
+    def stream_grade(
+        self,
+        interview_question: str,
+        conf_score: str,
+        response_text: str,
+        job_requirements: str,
+        resume_text: str,
+        mode: str = TWO_PASS,
+    ) -> Iterator[GradingProgress]:
+        """
+        Streams the grading, yielding the text generated so far, then the
+        parsed result once the last completion has ended
+        """
+        if mode == TWO_PASS:
+            return self._stream_two_pass(
+                interview_question,
+                conf_score,
+                response_text,
+                job_requirements,
+                resume_text,
+            )
+        if mode == ONE_PASS:
+            return self._stream_one_pass(
+                interview_question,
+                conf_score,
+                response_text,
+                job_requirements,
+                resume_text,
+            )
+        raise ValueError(
+            f"Unknown grading mode: {mode}, expected one of {GRADING_MODES}"
+        )
+
+    def _stream_two_pass(
+        self,
+        interview_question: str,
+        conf_score: str,
+        response_text: str,
+        job_requirements: str,
+        resume_text: str,
+    ) -> Iterator[GradingProgress]:
+        formatted_grading_prompt = GRADE_RESPONSE_PROMPT.format(
+            interview_question=interview_question,
+            conf_score=conf_score,
+            response_text=response_text,
+        )
+
+        grade = ""
+        for delta in self.llm.stream_complete(formatted_grading_prompt):
+            grade += delta
+            yield GradingProgress(grade=grade)
+
+        formatted_ranking_prompt = RANKING_AND_FEEDBACK_PROMPT.format(
+            job_requirements=job_requirements,
+            interview_feedback=grade,
+            resume_text=resume_text,
+        )
+
+        rank_and_feedback = ""
+        for delta in self.llm.stream_complete(formatted_ranking_prompt):
+            rank_and_feedback += delta
+            yield GradingProgress(grade=grade, rank_and_feedback=rank_and_feedback)
+
+        result = parse_yaml_string(
+            yaml_string=rank_and_feedback,
+            expected_keys=["name", "score", "feedback"],
+            cleanup=True,
+        )
+        yield GradingProgress(
+            grade=grade, rank_and_feedback=rank_and_feedback, result=result
+        )
+
+    def _stream_one_pass(
+        self,
+        interview_question: str,
+        conf_score: str,
+        response_text: str,
+        job_requirements: str,
+        resume_text: str,
+    ) -> Iterator[GradingProgress]:
+        formatted_prompt = GRADE_AND_RANK_PROMPT.format(
+            interview_question=interview_question,
+            conf_score=conf_score,
+            response_text=response_text,
+            job_requirements=job_requirements,
+            resume_text=resume_text,
+        )
+
+        grade_and_rank = ""
+        for delta in self.llm.stream_complete(formatted_prompt):
+            grade_and_rank += delta
+            yield GradingProgress(grade=grade_and_rank)
+
+        result = parse_yaml_string(
+            yaml_string=grade_and_rank,
+            expected_keys=["grades", "name", "score", "feedback"],
+            cleanup=True,
+        )
+        grades = result.get("grades")
+        missing = [d for d in GRADE_DIMENSIONS if d not in (grades or {})]
+        if missing:
+            logger.warning(f"One-pass grading is missing grades for {missing}")
+        yield GradingProgress(grade=grade_and_rank, result=result)
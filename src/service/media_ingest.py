@@ -0,0 +1,251 @@
+import os
+import re
+import subprocess
+import threading
+import numpy as np
+import speech_recognition as sr
+from typing import Iterator, Optional
+from moviepy.config import FFMPEG_BINARY
+
+# matches e.g. "Stream #0:0: Video: rawvideo (RGB[24] / 0x18424752), rgb24, 640x360"
+_VIDEO_STREAM_RE = re.compile(r"Stream #\d+:\d+.*: Video: .*?, (\d+)x(\d+)")
+_AUDIO_SAMPLE_WIDTH = 2  # s16le
+_NO_STREAM_ERROR = "does not contain any stream"
+
+
+class MediaIngest:
+    """
+    Opens an interview video a single time with ffmpeg and demuxes both the
+    audio track, decoded to mono PCM in memory, and the sampled video frames.
+
+    Usage:
+        with MediaIngest(video_path, sample_rate=24) as media:
+            for frame in media.iter_frames():
+                ...
+            audio = media.read_audio()
+
+    Frames are streamed in RGB and never stored, while the audio is buffered in
+    memory (~2MB per minute at 16kHz). With 'video' set to False only the
+    audio track is decoded. Requires a POSIX system, as the audio
+    is read from a dedicated pipe next to the frames pipe.
+    """
+
+    def __init__(
+        self,
+        input_video_file: str = "",
+        sample_rate: int = 2,
+        target_fps: Optional[float] = None,
+        max_size: Optional[int] = None,
+        audio_sample_rate: int = 16000,
+        video: bool = True,
+    ):
+        self.input_video_file = str(input_video_file)
+        self.sample_rate = max(sample_rate, 1)
+        self.target_fps = target_fps
+        self.max_size = max_size
+        self.audio_sample_rate = audio_sample_rate
+        self.video = video
+
+        self._process = None
+        self._audio_chunks = []
+        self._audio_thread = None
+        self._stderr_lines = []
+        self._stderr_thread = None
+        self._frame_shape = None
+        self._header_parsed = threading.Event()
+        self._frames = None
+        self._with_audio = True
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        """
+        Starts the single ffmpeg process that decodes the container.
+        """
+        if self._process is not None:
+            return
+
+        self._audio_chunks = []
+        self._stderr_lines = []
+        self._frame_shape = None
+        self._header_parsed.clear()
+
+        audio_read_fd, audio_write_fd = os.pipe()
+        if not self._with_audio:
+            # still hand out a pipe so the reader thread sees an empty track
+            os.close(audio_write_fd)
+            audio_write_fd = None
+        try:
+            self._process = subprocess.Popen(
+                self._build_command(audio_write_fd),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(audio_write_fd,) if self._with_audio else (),
+            )
+        finally:
+            if audio_write_fd is not None:
+                os.close(audio_write_fd)
+
+        self._audio_thread = threading.Thread(
+            target=self._read_audio_pipe, args=(audio_read_fd,), daemon=True
+        )
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._audio_thread.start()
+        self._stderr_thread.start()
+
+    def close(self):
+        """
+        Stops ffmpeg if it is still running and releases its pipes.
+        """
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
+        self._audio_thread.join()
+        self._stderr_thread.join()
+
+    def iter_frames(self) -> Iterator[np.ndarray]:
+        """
+        Yields the sampled video frames as RGB Numpy ndarray objects. Frames
+        can only be iterated once.
+        """
+        if self._frames is not None:
+            raise RuntimeError("Frames of this video were already consumed")
+        self._frames = self._read_frames()
+        return self._frames
+
+    def _read_frames(self) -> Iterator[np.ndarray]:
+        self.open()
+        if not self.video:
+            return
+
+        self._header_parsed.wait()
+        if self._frame_shape is None and self._with_audio and self._has_no_audio():
+            # ffmpeg refuses to start when the video has no audio track
+            self.close()
+            self._process = None
+            self._with_audio = False
+            self.open()
+            self._header_parsed.wait()
+        if self._frame_shape is None:
+            return
+
+        frame_bytes = int(np.prod(self._frame_shape))
+        while True:
+            buffer = self._process.stdout.read(frame_bytes)
+            if len(buffer) < frame_bytes:
+                break
+            yield np.frombuffer(buffer, dtype=np.uint8).reshape(self._frame_shape)
+
+    def read_audio(self) -> sr.AudioData:
+        """
+        Returns the whole audio track as mono 16-bit PCM. Any frames that have
+        not been iterated yet, including the rest of a partially iterated
+        iter_frames(), are skipped.
+        """
+        self.open()
+        if self._frames is None:
+            self.iter_frames()
+        # ffmpeg blocks writing the audio until the frames pipe is read
+        for _ in self._frames:
+            pass
+        if self.video and not self._process.stdout.closed:
+            # the frames generator may have been closed before its end
+            while self._process.stdout.read(65536):
+                pass
+
+        self._process.wait()
+        self._audio_thread.join()
+        self._stderr_thread.join()
+        if self._process.returncode != 0:
+            if not self.video and self._has_no_audio():
+                return sr.AudioData(b"", self.audio_sample_rate, _AUDIO_SAMPLE_WIDTH)
+            raise RuntimeError(
+                f"ffmpeg failed to decode {self.input_video_file}: "
+                + "".join(self._stderr_lines[-5:])
+            )
+
+        return sr.AudioData(
+            b"".join(self._audio_chunks), self.audio_sample_rate, _AUDIO_SAMPLE_WIDTH
+        )
+
+    def _has_no_audio(self) -> bool:
+        self._process.wait()
+        self._stderr_thread.join()
+        return any(_NO_STREAM_ERROR in line for line in self._stderr_lines)
+
+    def _build_command(self, audio_fd: Optional[int]) -> list[str]:
+        filters = []
+        if self.target_fps is not None:
+            filters.append(f"fps={self.target_fps}")
+        elif self.sample_rate > 1:
+            filters.append(f"select='not(mod(n\\,{self.sample_rate}))'")
+        if self.max_size is not None:
+            filters.append(
+                f"scale='if(gte(iw,ih),min(iw,{self.max_size}),-1)'"
+                f":'if(gte(iw,ih),-1,min(ih,{self.max_size}))':flags=area"
+            )
+
+        video_output = []
+        if self.video:
+            video_output = ["-map", "0:v:0"]
+            if filters:
+                video_output += ["-vf", ",".join(filters)]
+            video_output += [
+                "-fps_mode",
+                "passthrough",
+                "-pix_fmt",
+                "rgb24",
+                "-f",
+                "rawvideo",
+                "pipe:1",
+            ]
+        if audio_fd is None:
+            audio_output = []
+        else:
+            audio_output = [
+                "-map",
+                "0:a:0?",
+                "-ac",
+                "1",
+                "-ar",
+                str(self.audio_sample_rate),
+                "-f",
+                "s16le",
+                f"pipe:{audio_fd}",
+            ]
+
+        return (
+            [FFMPEG_BINARY, "-nostdin", "-nostats", "-i", self.input_video_file]
+            + video_output
+            + audio_output
+        )
+
+    def _read_audio_pipe(self, audio_fd: int):
+        with os.fdopen(audio_fd, "rb") as audio_pipe:
+            for chunk in iter(lambda: audio_pipe.read(65536), b""):
+                self._audio_chunks.append(chunk)
+
+    def _read_stderr(self):
+        in_output = False
+        for raw_line in self._process.stderr:
+            line = raw_line.decode(errors="replace")
+            self._stderr_lines.append(line)
+            if line.startswith("Output #0"):
+                in_output = True
+            elif in_output and not self._header_parsed.is_set():
+                match = _VIDEO_STREAM_RE.search(line)
+                if match:
+                    width, height = int(match.group(1)), int(match.group(2))
+                    self._frame_shape = (height, width, 3)
+                    self._header_parsed.set()
+        # unblock frame readers if ffmpeg exited before writing any header
+        self._header_parsed.set()
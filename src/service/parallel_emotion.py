@@ -0,0 +1,159 @@
+import os
+import cv2
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.service.frame_selector import AdaptiveFrameSelector
+from src.utils.utils import iter_frames, sampled_fps
+
+# thread pools read by TensorFlow, OpenMP and BLAS backends in each worker
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+    "TF_NUM_INTEROP_THREADS",
+)
+
+
+class ParallelEmotionAnalyzer:
+    """
+    Runs emotion analysis on a pool of worker processes, each keeping its own
+    resident emotion model. A video is split into time segments which are
+    analysed concurrently, and the per-frame results are merged in order.
+
+    Each worker is capped at 'threads_per_worker' TensorFlow/OpenCV threads,
+    so that n_workers * threads_per_worker should not exceed the core count.
+    """
+
+    def __init__(
+        self,
+        n_workers: Optional[int] = None,
+        threads_per_worker: int = 1,
+        segments_per_worker: int = 1,
+    ):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker
+        self.segments_per_worker = segments_per_worker
+
+        # spawn, as forking a process that already runs TensorFlow is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def analyze(
+        self,
+        input_video_file: str = "",
+        target_fps: float = 2.0,
+        min_fps: float = 0.5,
+        threshold: float = 6.0,
+        batch_size: int = 32,
+        max_size: Optional[int] = None,
+    ) -> tuple[list, list[float]]:
+        """
+        Analyses the emotions of the video, and returns the per-frame results
+        in order together with the time span each frame stands for, ready for
+        EmotionRecognition.process_emotions().
+        """
+        duration = self._get_duration(input_video_file)
+        n_segments = self.n_workers * self.segments_per_worker
+        bounds = [duration * i / n_segments for i in range(n_segments + 1)]
+        # the last segment is left open, in case the duration is underestimated
+        segments = [(bounds[i], bounds[i + 1]) for i in range(n_segments - 1)]
+        segments.append((bounds[-2], None))
+
+        futures = [
+            self._executor.submit(
+                _analyze_segment,
+                input_video_file,
+                start,
+                end,
+                target_fps,
+                min_fps,
+                threshold,
+                batch_size,
+                max_size,
+            )
+            for start, end in segments
+        ]
+
+        emotions, weights = [], []
+        for future in futures:
+            segment_emotions, segment_weights = future.result()
+            emotions.extend(segment_emotions)
+            weights.extend(segment_weights)
+
+        return emotions, weights
+
+    @staticmethod
+    def _get_duration(input_video_file: str) -> float:
+        cap = cv2.VideoCapture(input_video_file)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        finally:
+            cap.release()
+        if fps <= 0 or frame_count <= 0:
+            raise ValueError(f"Cannot read the duration of {input_video_file}")
+        return frame_count / fps
+
+
+def _init_worker(threads: int):
+    for env_var in THREAD_ENV_VARS:
+        os.environ[env_var] = str(threads)
+    cv2.setNumThreads(threads)
+
+    # imported here, so that TensorFlow only starts after the caps are set
+    import tensorflow as tf
+    from src.service.emotion_recognition import EmotionRecognition
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        # TensorFlow was already initialised, e.g. by the parent's __main__
+        pass
+
+    EmotionRecognition.load_model()
+
+
+def _analyze_segment(
+    input_video_file: str,
+    start: float,
+    end: Optional[float],
+    target_fps: float,
+    min_fps: float,
+    threshold: float,
+    batch_size: int,
+    max_size: Optional[int],
+) -> tuple[list, list[float]]:
+    from src.service.emotion_recognition import EmotionRecognition
+
+    selector = AdaptiveFrameSelector(
+        min_fps=min_fps, max_fps=target_fps, threshold=threshold
+    )
+    frames = iter_frames(
+        input_video_file,
+        target_fps=target_fps,
+        max_size=max_size,
+        start=start,
+        end=end,
+    )
+    fps = sampled_fps(input_video_file, target_fps=target_fps)
+    emotions = EmotionRecognition.detect_face_emotions_tracked(
+        selector.select(frames, fps), batch_size=batch_size
+    )
+    return emotions, selector.weights
@@ -0,0 +1,109 @@
+import re
+import logging
+import pymupdf
+from collections import Counter
+from typing import Optional
+
+# PyMuPDF span flag of bold fonts
+_BOLD_FLAG = 16
+_BULLET_RE = re.compile(r"^(?:[•●▪■‣⁃∙·]\s*|[-*]\s+)")
+
+logger = logging.getLogger(__name__)
+
+
+class PdfTextExtractor:
+    """
+    Extracts the text layer of digitally generated PDFs locally, and rebuilds
+    the markdown structure expected from PARSE_RESUME_PROMPT: lines set in a
+    font larger than the body text become headers, one level per distinct
+    size from the largest down, and short bold lines at body size become the
+    lowest header level.
+
+    Scanned or low-quality documents are rejected by a text-density heuristic,
+    so they can be sent to an OCR-capable parser instead: on average, a page
+    must hold at least 'min_chars_per_page' characters, of which at least
+    'min_valid_ratio' are printable (unmapped glyphs decode to U+FFFD).
+    """
+
+    def __init__(
+        self,
+        min_chars_per_page: int = 200,
+        min_valid_ratio: float = 0.95,
+        header_size_ratio: float = 1.15,
+        max_header_levels: int = 3,
+    ):
+        self.min_chars_per_page = min_chars_per_page
+        self.min_valid_ratio = min_valid_ratio
+        self.header_size_ratio = header_size_ratio
+        self.max_header_levels = max_header_levels
+
+    def extract(self, pdf_path: str = "") -> Optional[str]:
+        """
+        Returns the markdown of the PDF, or None when its text layer cannot be
+        read (e.g. encrypted or corrupt PDFs) or is too sparse or garbled to be
+        trusted
+        """
+        try:
+            with pymupdf.open(pdf_path) as document:
+                n_pages = max(len(document), 1)
+                lines = [
+                    line
+                    for page in document
+                    for line in self._iter_lines(page.get_text("dict"))
+                ]
+        except Exception as e:
+            logger.warning(f"Could not extract the text of {pdf_path}: {e}")
+            return None
+
+        text = "".join(line["text"] for line in lines)
+        chars = [c for c in text if not c.isspace()]
+        if not chars or len(chars) / n_pages < self.min_chars_per_page:
+            return None
+        valid = sum(c.isprintable() and c != "�" for c in chars)
+        if valid / len(chars) < self.min_valid_ratio:
+            return None
+
+        return self._to_markdown(lines)
+
+    @staticmethod
+    def _iter_lines(page_dict: dict):
+        for block in page_dict["blocks"]:
+            # image blocks have no lines
+            for line in block.get("lines", []):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                yield {
+                    "text": "".join(span["text"] for span in spans).strip(),
+                    "size": round(max(span["size"] for span in spans), 1),
+                    "bold": all(span["flags"] & _BOLD_FLAG for span in spans),
+                    "chars": sum(len(span["text"]) for span in spans),
+                }
+
+    def _to_markdown(self, lines: list[dict]) -> str:
+        sizes = Counter()
+        for line in lines:
+            sizes[line["size"]] += line["chars"]
+        body_size = sizes.most_common(1)[0][0]
+
+        header_sizes = sorted(
+            (size for size in sizes if size >= body_size * self.header_size_ratio),
+            reverse=True,
+        )[: self.max_header_levels - 1]
+        levels = {size: level for level, size in enumerate(header_sizes, start=1)}
+        bold_level = len(header_sizes) + 1
+
+        markdown = []
+        for line in lines:
+            text = line["text"]
+            if line["size"] in levels:
+                markdown.append(f"\n{'#' * levels[line['size']]} {text}\n")
+            elif line["size"] >= body_size * self.header_size_ratio:
+                # sizes beyond the header levels are kept at the lowest level
+                markdown.append(f"\n{'#' * bold_level} {text}\n")
+            elif line["bold"] and len(text) < 80 and not text.endswith("."):
+                markdown.append(f"\n{'#' * bold_level} {text}\n")
+            else:
+                markdown.append(_BULLET_RE.sub("- ", text))
+
+        return "\n".join(markdown).strip()
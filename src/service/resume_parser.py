@@ -1,14 +1,47 @@
 import yaml
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
 from llama_parse import LlamaParse
 from llama_index.core import SimpleDirectoryReader
 
+from src.service.pdf_text_extractor import PdfTextExtractor
 from src.template.parser_prompt import PARSE_RESUME_PROMPT
+from src.utils.cache import DiskCache, hash_bytes, hash_file, make_key
+from src.utils.concurrency import imap_unordered
+
+logger = logging.getLogger(__name__)
+
+# tiers that can handle a resume, from the cheapest
+CACHE_TIER = "cache"
+LOCAL_TIER = "local"
+LLAMAPARSE_TIER = "llamaparse"
+
+
+@dataclass
+class ResumeParseResult:
+    resume_path: str
+    markdown: Optional[str] = None
+    tier: Optional[str] = None
+    error: Optional[Exception] = None
 
 
 class ResumeParser:
-    def __init__(self, config_file_path: str = "config.yaml"):
+    def __init__(
+        self,
+        config_file_path: str = "config.yaml",
+        cache: Optional[DiskCache] = None,
+    ):
         """
-        Initiates a resume parser client
+        Initiates a resume parser client. With a cache, the markdown of each
+        resume is stored under the hash of the PDF and the parser settings, so
+        that parsing the same resume again makes no API call.
+
+        With LOCAL_FAST_PATH enabled, the text layer of the PDF is extracted
+        locally, and only scanned or low-quality documents are sent to
+        LlamaParse.
         """
 
         # load config
@@ -26,8 +59,30 @@ class ResumeParser:
             result_type="markdown",
             parsing_instruction=PARSE_RESUME_PROMPT,
             is_formatting_instruction=False,
+            ignore_errors=False,
         )
 
+        self._extractor = None
+        if config["LOCAL_FAST_PATH"]:
+            self._extractor = PdfTextExtractor(
+                min_chars_per_page=config["MIN_CHARS_PER_PAGE"]
+            )
+
+        self._cache = cache
+        # everything the parsed markdown depends on, besides the PDF itself
+        self._cache_params = {
+            "language": config["LANGUAGE"],
+            "disable_ocr": config["DISABLE_OCR"],
+            "page_roc_bbox": bbox,
+            "prompt_version": hash_bytes(PARSE_RESUME_PROMPT.encode()),
+            "local_fast_path": config["LOCAL_FAST_PATH"],
+            "min_chars_per_page": config["MIN_CHARS_PER_PAGE"],
+        }
+
+        # number of resumes handled by each tier, to track the offload rate
+        self.tier_counts = Counter()
+        self._lock = threading.Lock()
+
     def parse_resume_to_markdown(self, resume_path: str = "") -> str:
         """
         Parses the resume into markdown text.
@@ -35,8 +90,72 @@ class ResumeParser:
         Supported filetypes:
         - .pdf
         """
-        document = SimpleDirectoryReader(
-            input_files=[resume_path], file_extractor={".pdf": self._parser}
-        ).load_data()
+        resume_md, _ = self.parse_resume(resume_path)
+        return resume_md
 
-        return "\n".join([str(d.text) for d in document])
+    def parse_resume(self, resume_path: str = "") -> tuple[str, str]:
+        """
+        Parses the resume into markdown text, and returns it together with the
+        tier that handled it: CACHE_TIER, LOCAL_TIER or LLAMAPARSE_TIER.
+        """
+        resume_md, tier = None, CACHE_TIER
+        if self._cache is not None:
+            cache_key = make_key(hash_file(resume_path), self._cache_params)
+            resume_md = self._cache.get(cache_key)
+
+        if resume_md is None and self._extractor is not None:
+            resume_md, tier = self._extractor.extract(resume_path), LOCAL_TIER
+
+        if resume_md is None:
+            document = SimpleDirectoryReader(
+                input_files=[resume_path], file_extractor={".pdf": self._parser}
+            ).load_data()
+            resume_md = "\n".join([str(d.text) for d in document])
+            tier = LLAMAPARSE_TIER
+            if not resume_md.strip():
+                # never cache a failed parse as an empty resume
+                raise RuntimeError(f"LlamaParse returned no text for {resume_path}")
+
+        if self._cache is not None and tier != CACHE_TIER:
+            self._cache.set(cache_key, resume_md)
+
+        with self._lock:
+            self.tier_counts[tier] += 1
+            tier_counts = dict(self.tier_counts)
+        logger.info(
+            f"Resume {resume_path} parsed by the {tier} tier "
+            f"(tier counts: {tier_counts})"
+        )
+        return resume_md, tier
+
+    def parse_resumes(
+        self,
+        resume_paths: Iterable[str],
+        max_concurrency: int = 4,
+        max_retries: int = 2,
+        retry_delay: float = 1.0,
+    ) -> Iterator[ResumeParseResult]:
+        """
+        Parses many resumes concurrently, on at most 'max_concurrency' threads,
+        and yields each result as soon as it is ready, in completion order.
+
+        A resume that fails to parse, including a LlamaParse parse that returns
+        no text, is retried up to 'max_retries' times with an exponential
+        backoff, then yielded with its error set instead of failing the whole
+        batch.
+        """
+        for result in imap_unordered(
+            self.parse_resume,
+            resume_paths,
+            max_workers=max_concurrency,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+        ):
+            if result.error is not None:
+                logger.error(f"Failed to parse {result.item}: {result.error}")
+                yield ResumeParseResult(resume_path=result.item, error=result.error)
+            else:
+                markdown, tier = result.value
+                yield ResumeParseResult(
+                    resume_path=result.item, markdown=markdown, tier=tier
+                )
@@ -0,0 +1,197 @@
+import re
+import math
+import logging
+from collections import Counter
+from dataclasses import dataclass, field, replace
+
+logger = logging.getLogger(__name__)
+
+_HEADER_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that "
+    "the their this to we will with you your able must should can etc e g".split()
+)
+
+
+@dataclass
+class ResumeSection:
+    title: str
+    level: int
+    body: str
+    # indices of the enclosing sections, from the outermost
+    parents: list[int] = field(default_factory=list)
+
+    @property
+    def header(self) -> str:
+        return f"{'#' * self.level} {self.title}" if self.level else ""
+
+
+def estimate_tokens(text: str = "") -> int:
+    """
+    Cheap estimate of the LLM token count of English text, ~4 characters per
+    token
+    """
+    return math.ceil(len(text) / 4)
+
+
+def tokenize(text: str = "") -> list[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def split_sections(resume_md: str = "") -> list[ResumeSection]:
+    """
+    Splits resume markdown into sections at its headers (#, ##, ...), as
+    enforced by PARSE_RESUME_PROMPT. Any text before the first header is kept
+    as a level 0 section.
+    """
+    sections = [ResumeSection(title="", level=0, body="")]
+    body_lines = []
+    stack = []  # indices of the currently open sections
+    for line in resume_md.splitlines():
+        match = _HEADER_RE.match(line)
+        if match is None:
+            body_lines.append(line)
+            continue
+
+        sections[-1].body = "\n".join(body_lines).strip()
+        body_lines = []
+        level = len(match.group(1))
+        while stack and sections[stack[-1]].level >= level:
+            stack.pop()
+        sections.append(
+            ResumeSection(title=match.group(2), level=level, body="", parents=stack[:])
+        )
+        stack.append(len(sections) - 1)
+    sections[-1].body = "\n".join(body_lines).strip()
+
+    if not sections[0].body:
+        sections.pop(0)
+        for section in sections:
+            section.parents = [i - 1 for i in section.parents]
+    return sections
+
+
+class ResumeSectionSelector:
+    """
+    Shrinks a parsed resume to the sections most relevant to a job, before it
+    is put in the ranking prompt.
+
+    Sections are scored with BM25 against the job requirements, then kept from
+    the highest score down while they fit in 'token_budget' (estimated, see
+    estimate_tokens). A relevant section too long for the rest of the budget
+    is cut to its first lines (e.g. bullets) that fit, rather than dropped.
+    The text before the first header (name, contacts) is always kept, and kept
+    sections are rendered in their original order under the headers of their
+    parent sections.
+    """
+
+    def __init__(self, token_budget: int = 1500, k1: float = 1.2, b: float = 0.75):
+        self.token_budget = token_budget
+        self.k1 = k1
+        self.b = b
+
+    def select(self, resume_md: str = "", job_requirements: str = "") -> str:
+        """
+        Returns the resume markdown reduced to the most relevant sections
+        """
+        original_tokens = estimate_tokens(resume_md)
+        if original_tokens <= self.token_budget:
+            logger.info(f"Resume of {original_tokens} tokens kept whole (0 saved)")
+            return resume_md
+
+        sections = split_sections(resume_md)
+        scores = self.score(sections, job_requirements)
+        kept = {i for i, section in enumerate(sections) if section.level == 0}
+        used = sum(self._cost(sections, i, kept) for i in kept)
+
+        for i in sorted(range(len(sections)), key=lambda i: -scores[i]):
+            if i in kept:
+                continue
+            cost = self._cost(sections, i, kept)
+            if used + cost > self.token_budget and scores[i] > 0:
+                cut = self._truncate(sections, i, kept, self.token_budget - used)
+                if cut.body:
+                    sections[i] = cut
+                    cost = self._cost(sections, i, kept)
+            if used + cost <= self.token_budget:
+                kept.add(i)
+                used += cost
+
+        selected_md = self._render(sections, kept)
+        selected_tokens = estimate_tokens(selected_md)
+        logger.info(
+            f"Kept {len(kept)}/{len(sections)} resume sections, "
+            f"{original_tokens} -> {selected_tokens} tokens "
+            f"({original_tokens - selected_tokens} saved)"
+        )
+        return selected_md
+
+    def score(
+        self, sections: list[ResumeSection], job_requirements: str = ""
+    ) -> list[float]:
+        """
+        BM25 relevance of each section, with its title, to the job requirements
+        """
+        documents = [tokenize(f"{s.title}\n{s.body}") for s in sections]
+        query = set(tokenize(job_requirements))
+        if not documents or not query:
+            return [0.0] * len(sections)
+
+        avg_length = max(sum(map(len, documents)) / len(documents), 1)
+        document_freq = Counter(w for doc in documents for w in set(doc))
+        n_documents = len(documents)
+
+        scores = []
+        for doc in documents:
+            term_freq = Counter(doc)
+            norm = self.k1 * (1 - self.b + self.b * len(doc) / avg_length)
+            score = 0.0
+            for word in query & term_freq.keys():
+                df = document_freq[word]
+                idf = math.log(1 + (n_documents - df + 0.5) / (df + 0.5))
+                tf = term_freq[word]
+                score += idf * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    @staticmethod
+    def _cost(sections: list[ResumeSection], index: int, kept: set) -> int:
+        # the section, and the headers of its parents that are not kept yet
+        section = sections[index]
+        headers = [sections[p].header for p in section.parents if p not in kept]
+        return estimate_tokens("\n".join(headers + [section.header, section.body]))
+
+    @classmethod
+    def _truncate(
+        cls, sections: list[ResumeSection], index: int, kept: set, budget: int
+    ) -> ResumeSection:
+        # the section cut to the most body lines that fit in the budget
+        section = sections[index]
+        lines = section.body.splitlines()
+        n_lines = 0
+        while n_lines < len(lines):
+            cut = replace(section, body="\n".join(lines[: n_lines + 1]).strip())
+            if cls._cost(sections[:index] + [cut], index, kept) > budget:
+                break
+            n_lines += 1
+        return replace(section, body="\n".join(lines[:n_lines]).strip())
+
+    @staticmethod
+    def _render(sections: list[ResumeSection], kept: set) -> str:
+        shown = set()
+        lines = []
+        for i, section in enumerate(sections):
+            if i not in kept:
+                continue
+            for p in section.parents:
+                if p not in shown:
+                    lines.append(sections[p].header)
+                    shown.add(p)
+            if section.header:
+                lines.append(section.header)
+            if section.body:
+                lines.append(section.body)
+            lines.append("")
+            shown.add(i)
+        return "\n".join(lines).strip()
@@ -109,3 +109,99 @@ score: <score>
 feedback: <feedback text>
 """
 )
+
+
+# one-pass alternative to GRADE_RESPONSE_PROMPT followed by RANKING_AND_FEEDBACK_PROMPT
+GRADE_AND_RANK_PROMPT = PromptTemplate(
+    """
+You are an HR specialist and an interviewer evaluating an interviewee for a specific role. 
+Your task is to grade the interviewee's performance in the interview, then assess their suitability for the role, based on the following information:
+
+1.  **Interview Question**: 
+    The question the interviewee answered.
+
+2.  **Facial Confidence Score**: 
+    A score ranging from 0 to 100, computed from the interviewee's facial expressions during their response.
+
+3.  **Interviewee's Response**: 
+    The text of the interviewee's answer to the interview question.
+
+4.  **Job Requirements**: 
+    A list of skills, experiences, and qualifications required for the role.
+
+5.  **Resume Text**: 
+    A parsed version of the interviewee's resume, which includes their work experience, skills, education, and other relevant information.
+
+Using these inputs, generate an output strictly in the following YAML format:
+
+###########################
+grades:
+  answer_quality: <grade text>
+  problem_solving: <grade text>
+  confidence: <grade text>
+  personality: <grade text>
+  overall_performance: <grade text>
+name: <name>
+score: <score>
+feedback: <feedback text>
+###########################
+
+
+Details for the output:
+1.  **grades**:
+    A short evaluation of the interviewee's performance in each of the following areas, with their strengths and areas for improvement.
+    - **answer_quality**: The clarity, relevance, and accuracy of their response. Did the interviewee address the key points effectively?
+    - **problem_solving**: How well they tackled any problem presented in the question. Were they able to think critically, analyze the situation, and propose solutions?
+    - **confidence**: Their confidence level, based on their facial confidence score and their overall demeanor in the response, and how it impacts their communication.
+    - **personality**: Their tone, communication style, and interpersonal skills. Do they demonstrate qualities like openness, empathy, or assertiveness?
+    - **overall_performance**: A holistic evaluation of their performance in the interview, based on the above areas.
+
+2.  **name**:
+    Name of the interviewee.
+
+3.  **score**: 
+    A score ranging from 0 to 100, where 0 means the interviewee is not recommended for the position, and 100 means they are a perfect match for the job.
+
+4.  **feedback**:
+    - A detailed breakdown explaining how the interviewee’s experience, skills, and interview performance align or do not align with the job requirements.
+    - Discuss whether the interviewee’s skills, experiences, and overall traits match or fail to meet the required qualifications.
+    - Provide a short, concise sentence summarizing the interviewee’s suitability for the role.
+
+Ensure that the grades and feedback are comprehensive yet concise, offering actionable insights for HR professionals to make a decision about the interviewee’s fit for the role.
+
+
+########################################
+Interview Question:
+{interview_question}
+
+########################################
+Interviewee's Facial Confidence Score:
+{conf_score}
+
+########################################
+Interviewee's response in text:
+{response_text}
+
+########################################
+Job Requirements:
+{job_requirements}
+
+########################################
+Resume Text:
+{resume_text}
+
+########################################
+
+Output strictly following the below YAML format:
+
+grades:
+  answer_quality: <grade text>
+  problem_solving: <grade text>
+  confidence: <grade text>
+  personality: <grade text>
+  overall_performance: <grade text>
+name: <name>
+score: <score>
+feedback: <feedback text>
+"""
+)
@@ -0,0 +1,20 @@
+"""Base class for speech-to-text backends"""
+
+from abc import abstractmethod
+
+import speech_recognition as sr
+
+
+class BaseTranscriber:
+    @abstractmethod
+    def __init__(self):
+        """Transcriber initialization"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def transcribe(self, audio: sr.AudioData) -> str:
+        """
+        Speech-to-text implementation by each backend. Raises
+        sr.UnknownValueError when the audio contains no recognisable speech.
+        """
+        raise NotImplementedError
@@ -0,0 +1,3 @@
+GOOGLE_TRANSCRIBER = "google"
+SPHINX_TRANSCRIBER = "sphinx"
+STUB_TRANSCRIBER = "stub"
@@ -0,0 +1,16 @@
+"""Google Web Speech API Implementation"""
+
+import speech_recognition as sr
+
+from src.transcription.base_transcriber import BaseTranscriber
+
+
+class GoogleTranscriber(BaseTranscriber):
+    def __init__(self, language: str = "en-US"):
+        """Initiate Google Web Speech recognizer"""
+
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        return self._recognizer.recognize_google(audio, language=self.language)
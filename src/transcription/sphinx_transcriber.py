@@ -0,0 +1,16 @@
+"""CMU Sphinx Implementation, running offline on the CPU"""
+
+import speech_recognition as sr
+
+from src.transcription.base_transcriber import BaseTranscriber
+
+
+class SphinxTranscriber(BaseTranscriber):
+    def __init__(self, language: str = "en-US"):
+        """Initiate offline Sphinx recognizer, requires pocketsphinx"""
+
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        return self._recognizer.recognize_sphinx(audio, language=self.language)
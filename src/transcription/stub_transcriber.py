@@ -0,0 +1,27 @@
+"""Deterministic stub for tests and benchmarks"""
+
+import time
+import speech_recognition as sr
+
+from src.transcription.base_transcriber import BaseTranscriber
+
+
+class StubTranscriber(BaseTranscriber):
+    def __init__(
+        self,
+        text: str = "{duration:.2f} seconds of speech",
+        latency: float = 0.0,
+    ):
+        """
+        Initiate stub returning 'text', formatted with the audio duration in
+        seconds, after sleeping 'latency' seconds to mimic a remote API
+        """
+
+        self.text = text
+        self.latency = latency
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        duration = len(audio.frame_data) / audio.sample_width / audio.sample_rate
+        return self.text.format(duration=duration)
@@ -0,0 +1,31 @@
+import yaml
+
+from src.transcription.enums import (
+    GOOGLE_TRANSCRIBER,
+    SPHINX_TRANSCRIBER,
+    STUB_TRANSCRIBER,
+)
+from src.transcription.base_transcriber import BaseTranscriber
+from src.transcription.google_transcriber import GoogleTranscriber
+from src.transcription.sphinx_transcriber import SphinxTranscriber
+from src.transcription.stub_transcriber import StubTranscriber
+
+
+def get_transcriber(config_file_path: str = "config.yaml") -> BaseTranscriber:
+    """
+    Initiates speech-to-text backend from config file
+    """
+
+    # load config
+    with open(config_file_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    # init & return transcriber
+    if config["PROVIDER"] == GOOGLE_TRANSCRIBER:
+        return GoogleTranscriber(language=config["LANGUAGE"])
+    elif config["PROVIDER"] == SPHINX_TRANSCRIBER:
+        return SphinxTranscriber(language=config["LANGUAGE"])
+    elif config["PROVIDER"] == STUB_TRANSCRIBER:
+        return StubTranscriber(text=config["TEXT"], latency=config["LATENCY"])
+    else:
+        raise ValueError(config["PROVIDER"])
@@ -0,0 +1,178 @@
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Persistent key-value cache stored in a single SQLite file, evicting the
+    least recently used entries once the values exceed 'max_bytes' in total.
+    Safe to share between threads and processes.
+
+    Values are pickled, so only point it at cache files written by this
+    application.
+    """
+
+    def __init__(
+        self,
+        path: str = "cache/cache.sqlite",
+        max_bytes: int = 1024**3,
+        name: str = "cache",
+    ):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.name = name
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, last_access REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access "
+                "ON entries (last_access)"
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        logger.info(
+            f"[{self.name}] {'hit' if row is not None else 'miss'} "
+            f"(hits={self.hits}, misses={self.misses}, "
+            f"hit rate={self.hits / (self.hits + self.misses):.0%})"
+        )
+
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            logger.warning(f"[{self.name}] entry of {len(blob)} bytes not cached")
+            return
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._evict(conn)
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def __contains__(self, key: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def _connect(self) -> "_ClosingConnection":
+        return _ClosingConnection(self.path)
+
+    def _evict(self, conn: sqlite3.Connection):
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.info(f"[{self.name}] evicted {len(evicted)} entries")
+
+
+class _ClosingConnection:
+    """
+    Opens a SQLite connection for the duration of a with-block, committing on
+    success, then closes it
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=30)
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+        finally:
+            self._conn.close()
+
+
+def hash_file(file_path: str = "", chunk_size: int = 1024**2) -> str:
+    """
+    Returns the SHA-256 hex digest of the content of a file
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data: bytes = b"") -> str:
+    """
+    Returns the SHA-256 hex digest of in-memory content, e.g. decoded audio
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Builds a cache key from JSON-serialisable parts, e.g. a content hash and
+    the parameters that the cached value depends on
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,61 @@
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskResult:
+    item: Any
+    value: Any = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+
+
+def run_with_retries(
+    fn: Callable[[Any], Any],
+    item: Any,
+    max_retries: int = 2,
+    retry_delay: float = 1.0,
+) -> TaskResult:
+    """
+    Calls fn(item), retrying up to 'max_retries' times with an exponential
+    backoff, and returns either its value or the last error
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return TaskResult(item=item, value=fn(item), attempts=attempt + 1)
+        except Exception as e:
+            if attempt == max_retries:
+                return TaskResult(item=item, error=e, attempts=attempt + 1)
+            logger.warning(f"{fn.__name__}({item!r}) failed ({e}), retrying")
+            time.sleep(retry_delay * 2**attempt)
+
+
+def imap_unordered(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+    max_retries: int = 2,
+    retry_delay: float = 1.0,
+) -> Iterator[TaskResult]:
+    """
+    Calls fn on every item on at most 'max_workers' threads, and yields the
+    results as they finish. A failing item is retried on its own, then yielded
+    with its error, without affecting the others.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_with_retries, fn, item, max_retries, retry_delay)
+            for item in items
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # the caller stopped consuming early
+            for future in futures:
+                future.cancel()
@@ -1,9 +1,12 @@
 import cv2
 import yaml
+import subprocess
 import numpy as np
 from pathlib import Path
+from typing import Iterator, Optional, Union
 import speech_recognition as sr
 from moviepy import VideoFileClip
+from moviepy.config import FFMPEG_BINARY
 
 
 def extract_audio(
@@ -38,37 +41,255 @@ def extract_audio(
         return None
 
 
-def audio2text(audio_file: str = "") -> str:
+def extract_audio_pcm(
+    input_video_file: str = "",
+    sample_rate: int = 16000,
+) -> sr.AudioData:
+    """
+    Extracts the audio track of the input video file straight into memory, as
+    mono 16-bit PCM at a sample rate suitable for speech recognition, through
+    an ffmpeg pipe. Nothing is written to disk, so concurrent calls never share
+    files. Returns empty audio if the video has no audio track.
+    """
+    command = [
+        FFMPEG_BINARY,
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        str(Path(input_video_file)),
+        "-map",
+        "0:a:0?",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "s16le",
+        "pipe:1",
+    ]
+    process = subprocess.run(command, capture_output=True)
+    if process.returncode != 0:
+        stderr = process.stderr.decode(errors="replace")
+        if "does not contain any stream" not in stderr:
+            raise RuntimeError(f"ffmpeg failed to extract audio: {stderr}")
+        return sr.AudioData(b"", sample_rate, 2)
+
+    return sr.AudioData(process.stdout, sample_rate, 2)
+
+
+def audio2text(audio_file: Union[str, sr.AudioData] = "") -> str:
     """
     Converts audio to text using Google's text-to-audio engine (Local),
     and returns the text.
+
+    Accepts either the path to an audio file, or audio already decoded in
+    memory such as extract_audio_pcm() or MediaIngest.read_audio().
     """
     r = sr.Recognizer()
+    if isinstance(audio_file, sr.AudioData):
+        return r.recognize_google(audio_file)
+
     with sr.AudioFile(audio_file) as source:
         audio = r.record(source)
         text = r.recognize_google(audio)
     return text
 
 
-def sample_frames(input_video_file: str = "", sample_rate: int = 2) -> list[np.ndarray]:
+SAMPLING_METHODS = ("read", "grab", "seek")
+
+
+def sample_frames(
+    input_video_file: str = "",
+    sample_rate: int = 2,
+    target_fps: Optional[float] = None,
+    method: str = "grab",
+    max_size: Optional[int] = None,
+) -> list[np.ndarray]:
     """
     Samples one frame every 'sample_rate' frames from the video file and returns
     them in the form of a list of Numpy ndarray objects.
+
+    See iter_frames() for the sampling options. Prefer iter_frames() for long
+    videos, as this holds every sampled frame in memory at once.
+    """
+    return list(
+        iter_frames(input_video_file, sample_rate, target_fps, method, max_size)
+    )
+
+
+def iter_frames(
+    input_video_file: str = "",
+    sample_rate: int = 2,
+    target_fps: Optional[float] = None,
+    method: str = "grab",
+    max_size: Optional[int] = None,
+    start: float = 0.0,
+    end: Optional[float] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Lazily samples one frame every 'sample_rate' frames from the video file and
+    yields them as RGB Numpy ndarray objects, so only one decoded frame is held
+    at a time.
+
+    If 'target_fps' is given, frames are instead sampled at that many frames per
+    second of video, so the cost does not depend on the source frame rate.
+    If 'max_size' is given, frames are downscaled so that their longest side
+    is at most 'max_size' pixels. 'start' and 'end' (in seconds) restrict
+    sampling to a segment of the video.
+
+    Supported sampling methods are:
+     - "read" : decodes every frame and discards the ones not sampled
+     - "grab" : skips frames with cap.grab() and only decodes the sampled ones
+     - "seek" : seeks to the timestamp of each sampled frame
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method: {method}")
+
+    cap = cv2.VideoCapture(input_video_file)
+    try:
+        step = _frame_step(cap, sample_rate, target_fps)
+        first, last = _frame_range(cap, start, end)
+        if first > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+
+        if method == "seek":
+            frames = _seek_frames(cap, step, first, last)
+        else:
+            max_count = None if last is None else last - first
+            frames = _scan_frames(cap, step, method == "read", max_count)
+
+        for frame in frames:
+            yield _to_rgb(frame, max_size)
+    finally:
+        cap.release()
+
+
+def sampled_fps(
+    input_video_file: str = "",
+    sample_rate: int = 2,
+    target_fps: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Returns the rate, in frames per second of video, at which iter_frames()
+    samples the video with the same arguments, which is lower than
+    'target_fps' when the video itself is. None if the frame rate is unknown.
     """
     cap = cv2.VideoCapture(input_video_file)
-    frames = []
+    try:
+        source_fps = cap.get(cv2.CAP_PROP_FPS)
+        if source_fps <= 0:
+            return None
+        return source_fps / _frame_step(cap, sample_rate, target_fps)
+    finally:
+        cap.release()
+
+
+def _to_rgb(frame: np.ndarray, max_size: Optional[int] = None) -> np.ndarray:
+    """
+    Converts a BGR frame to RGB, downscaling it first if its longest side
+    exceeds 'max_size'.
+    """
+    if max_size is not None:
+        height, width = frame.shape[:2]
+        scale = max_size / max(height, width)
+        if scale < 1:
+            frame = cv2.resize(
+                frame,
+                (max(int(width * scale), 1), max(int(height * scale), 1)),
+                interpolation=cv2.INTER_AREA,
+            )
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def _frame_step(
+    cap: cv2.VideoCapture, sample_rate: int, target_fps: Optional[float]
+) -> float:
+    """
+    Returns the (possibly fractional) number of source frames between two
+    sampled frames.
+    """
+    if target_fps is None:
+        return float(max(sample_rate, 1))
+
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    if target_fps <= 0 or source_fps <= 0:
+        return float(max(sample_rate, 1))
+
+    return max(source_fps / target_fps, 1.0)
+
+
+def _frame_range(
+    cap: cv2.VideoCapture, start: float = 0.0, end: Optional[float] = None
+) -> tuple[int, Optional[int]]:
+    """
+    Converts a segment in seconds into a [first, last) range of frame indices.
+    """
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    if source_fps <= 0:
+        return 0, None
+
+    first = max(int(round(start * source_fps)), 0)
+    last = None if end is None else max(int(round(end * source_fps)), first)
+    return first, last
+
+
+def _scan_frames(
+    cap: cv2.VideoCapture,
+    step: float,
+    decode_all: bool = False,
+    max_count: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Walks through the video sequentially and yields one BGR frame every 'step'
+    frames, stopping after 'max_count' frames if given. Unless 'decode_all' is
+    set, skipped frames are only grabbed.
+    """
     count = 0
+    next_sample = 0.0
 
-    while cap.isOpened():
-        ret, frame = cap.read()
+    while cap.isOpened() and (max_count is None or count < max_count):
+        if decode_all:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.grab(), None
         if not ret:
             break
-        if count % sample_rate == 0:
-            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if count >= next_sample:
+            if frame is None:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+            yield frame
+            next_sample += step
         count += 1
-    cap.release()
 
-    return frames
+
+def _seek_frames(
+    cap: cv2.VideoCapture, step: float, first: int = 0, last: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Seeks directly to every sampled frame of the [first, last) range by
+    timestamp and yields it as a BGR frame. Only worth it when the step spans
+    many frames, as each seek restarts decoding from the last keyframe.
+    """
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    if source_fps <= 0 or frame_count <= 0:
+        max_count = None if last is None else last - first
+        yield from _scan_frames(cap, step, max_count=max_count)
+        return
+
+    if last is not None:
+        frame_count = min(frame_count, last)
+    position = float(first)
+    while cap.isOpened() and position < frame_count:
+        cap.set(cv2.CAP_PROP_POS_MSEC, position / source_fps * 1000)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+        position += step
 
 
 def parse_yaml_string(
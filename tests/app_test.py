@@ -0,0 +1,195 @@
+import pytest
+import sys
+import types
+import importlib
+from pathlib import Path
+import pandas as pd
+import speech_recognition as sr
+import yaml
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.service.chunked_transcriber import ChunkedTranscriber
+from src.service.interview_grader import InterviewGrader
+from src.service.resume_sections import ResumeSectionSelector
+from src.utils.cache import DiskCache
+
+TRANSCRIPTION_CONFIG_DIR = (
+    Path(__file__).resolve().parent.parent / "src/configs/transcription"
+)
+
+GRADE = "Answer quality is good, confidence is high."
+RANKING = """```yaml
+name: Jane Doe
+score: 72
+feedback:
+  - Strong Python skills.
+  - Little MLOps experience.
+```"""
+
+
+class ScriptedLLM(BaseLLMProvider):
+    def __init__(self, completions: list[str], chunk_size: int = 8):
+        self.completions = completions
+        self.chunk_size = chunk_size
+        self.n_calls = 0
+
+    def complete(self, prompt: str = "") -> str:
+        self.n_calls += 1
+        return self.completions[(self.n_calls - 1) % len(self.completions)]
+
+    def stream_complete(self, prompt: str = ""):
+        completion = self.complete(prompt)
+        for i in range(0, len(completion), self.chunk_size):
+            yield completion[i : i + self.chunk_size]
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return self.complete(prompt)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # the feedback database is written to on every submission
+    firebase = types.ModuleType("src.configs.database.firebase")
+    firebase.write_user_data = lambda *args: None
+    firebase.read_all_users = lambda: pd.DataFrame()
+    monkeypatch.setitem(sys.modules, "src.configs.database.firebase", firebase)
+    monkeypatch.delitem(sys.modules, "src.app", raising=False)
+    return importlib.import_module("src.app")
+
+
+class CountingRecognizer:
+    def __init__(self):
+        self.n_calls = 0
+
+    def __call__(self, audio: sr.AudioData) -> str:
+        self.n_calls += 1
+        return f"transcript {self.n_calls}"
+
+
+def make_interface(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app.GradioInterface, "initialize_services", lambda self: None)
+    interface = app.GradioInterface()
+    interface.llm = ScriptedLLM([GRADE, RANKING])
+    interface.grader = InterviewGrader(interface.llm)
+    interface.section_selector = ResumeSectionSelector()
+    interface.transcriber = ChunkedTranscriber(CountingRecognizer(), min_chunk_s=0)
+    interface.transcriber_config = load_transcription_config("stub.yaml")
+    interface.transcript_cache = DiskCache(str(tmp_path / "transcripts.sqlite"))
+    return interface
+
+
+def load_transcription_config(config_file: str) -> dict:
+    with open(TRANSCRIPTION_CONFIG_DIR / config_file, "r") as f:
+        return yaml.safe_load(f)
+
+
+@pytest.fixture
+def interface(app, monkeypatch, tmp_path):
+    return make_interface(app, monkeypatch, tmp_path)
+
+
+@pytest.fixture
+def speech():
+    # a one second utterance after a one second pause
+    tone = (b"\x00\x20" + b"\x00\xe0") * 8000
+    return sr.AudioData(b"\x00\x00" * 16000 + tone, 16000, 2)
+
+
+def stream_feedback(interface) -> list:
+    return list(
+        interface.stream_feedback(
+            "Tell me about a project.",
+            "Python, MLOps",
+            "80",
+            "I built a recommender system.",
+            "# Jane Doe\nPython developer",
+        )
+    )
+
+
+def test_stream_feedback_yields_progress_before_feedback(interface):
+    updates = stream_feedback(interface)
+
+    progress = [md for md, feedback_df in updates if feedback_df is None]
+    assert len(progress) > 2
+    assert updates[-1][1] is not None
+    # the markdown grows with each streamed piece of the grade
+    assert GRADE[:8] in progress[0] and GRADE not in progress[0]
+    assert GRADE in progress[-1] and "Jane Doe" in progress[-1]
+
+
+def test_stream_feedback_matches_get_feedback(interface):
+    _, streamed_df = stream_feedback(interface)[-1]
+    feedback_df = interface.get_feedback(
+        "Tell me about a project.",
+        "Python, MLOps",
+        "80",
+        "I built a recommender system.",
+        "# Jane Doe\nPython developer",
+    )
+
+    pd.testing.assert_frame_equal(streamed_df, feedback_df)
+    assert feedback_df["Score"].tolist() == [72, 72]
+
+
+def test_process_submission_stream_ends_with_result(interface, monkeypatch):
+    monkeypatch.setattr(interface, "process_media", lambda path: ("answer", "80"))
+    monkeypatch.setattr(interface, "process_resume", lambda path: "# Jane Doe")
+    args = ("interview.mp4", "resume.pdf", "question", "LLM Engineer", "Python")
+
+    results = list(interface.process_submission_stream(*args))
+
+    assert all(r.candidate_name is None for r in results[:-1])
+    assert all("in Progress" in r.feedback_md for r in results[:-1])
+    assert results[-1].error_message is None
+    assert results[-1].candidate_name == "Jane Doe"
+    assert results[-1].candidate_score == 72
+
+    final = interface.process_submission(*args)
+    assert (final.candidate_name, final.candidate_score) == ("Jane Doe", 72)
+
+
+def test_transcribe_audio_caches_transcript(interface, speech):
+    assert interface.transcribe_audio(speech) == "transcript 1"
+    # the same PCM, decoded again
+    assert interface.transcribe_audio(sr.AudioData(speech.frame_data, 16000, 2)) == (
+        "transcript 1"
+    )
+    assert interface.transcriber.recognize.n_calls == 1
+
+
+def test_transcribe_audio_without_cache_refreshes_entry(interface, speech):
+    interface.transcribe_audio(speech)
+
+    assert interface.transcribe_audio(speech, use_cache=False) == "transcript 2"
+    assert interface.transcribe_audio(speech) == "transcript 2"
+    assert interface.transcriber.recognize.n_calls == 2
+
+
+def test_transcript_cache_bypass_env(app, monkeypatch, tmp_path, speech):
+    monkeypatch.setenv("TRANSCRIPT_CACHE_BYPASS", "1")
+    interface = make_interface(importlib.reload(app), monkeypatch, tmp_path)
+
+    interface.transcribe_audio(speech)
+    assert interface.transcribe_audio(speech) == "transcript 2"
+
+
+def test_transcript_cache_key_depends_on_backend(interface, speech):
+    interface.transcribe_audio(speech)
+    interface.transcriber_config = load_transcription_config("sphinx-en.yaml")
+
+    assert interface.transcribe_audio(speech) == "transcript 2"
+    assert interface.transcriber.recognize.n_calls == 2
+
+
+def test_emotion_cache_key_depends_on_workers(app, monkeypatch, tmp_path):
+    video_file = tmp_path / "interview.mp4"
+    video_file.write_bytes(b"video")
+    serial_key = make_interface(app, monkeypatch, tmp_path)._emotion_cache_key(
+        str(video_file)
+    )
+
+    monkeypatch.setenv("EMOTION_WORKERS", "4")
+    interface = make_interface(importlib.reload(app), monkeypatch, tmp_path)
+    assert interface._emotion_cache_key(str(video_file)) != serial_key
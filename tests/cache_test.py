@@ -0,0 +1,52 @@
+import pytest
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.utils.cache import DiskCache, hash_bytes, hash_file, make_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=10_000, name="test")
+
+
+def test_cache_roundtrip(cache):
+    value = {"emotions": [[{"emotion": {"happy": np.float32(50)}}]], "conf": 42.0}
+
+    assert cache.get("key") is None
+    cache.set("key", value)
+
+    assert cache.get("key") == value
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_cache_evicts_least_recently_used(cache):
+    cache.set("a", b"x" * 4000)
+    cache.set("b", b"x" * 4000)
+    cache.get("a")
+    cache.set("c", b"x" * 4000)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["size_bytes"] <= 10_000
+
+
+def test_cache_persists_across_instances(cache):
+    cache.set("key", "value")
+
+    assert DiskCache(cache.path).get("key") == "value"
+
+
+def test_make_key_and_hash_file(tmp_path):
+    file_path = tmp_path / "video.mp4"
+    file_path.write_bytes(b"content")
+
+    assert hash_file(str(file_path)) == hash_file(str(file_path))
+    assert hash_file(str(file_path)) == hash_bytes(b"content")
+    assert make_key("hash", {"a": 1, "b": 2}) == make_key("hash", {"b": 2, "a": 1})
+    assert make_key("hash", {"a": 1}) != make_key("hash", {"a": 2})
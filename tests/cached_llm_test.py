@@ -0,0 +1,101 @@
+import pytest
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.cached_llm import CachedLLM
+from src.utils.cache import DiskCache
+
+
+class CountingLLM(BaseLLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, prompt: str = "") -> str:
+        self.calls += 1
+        return f"grade of {prompt}"
+
+    def stream_complete(self, prompt: str = ""):
+        self.calls += 1
+        yield "grade "
+        yield f"of {prompt}"
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return self.complete(prompt)
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return DiskCache(str(tmp_path / "llm.sqlite"), max_bytes=100_000, name="test")
+
+
+def make_cached_llm(llm, disk_cache, temperature=0, **kwargs):
+    return CachedLLM(
+        llm,
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=temperature,
+        cache=disk_cache,
+        **kwargs,
+    )
+
+
+def test_cached_llm_completes_once(disk_cache):
+    llm = CountingLLM()
+    cached_llm = make_cached_llm(llm, disk_cache)
+
+    assert cached_llm.complete("answer") == "grade of answer"
+    assert cached_llm.complete("answer") == "grade of answer"
+    assert asyncio.run(cached_llm.acomplete("answer")) == "grade of answer"
+    assert "".join(cached_llm.stream_complete("answer")) == "grade of answer"
+    assert llm.calls == 1
+
+    cached_llm.complete("other answer")
+    assert llm.calls == 2
+
+
+def test_cached_llm_persists_across_instances(disk_cache):
+    make_cached_llm(CountingLLM(), disk_cache).complete("answer")
+
+    llm = CountingLLM()
+    assert make_cached_llm(llm, disk_cache).complete("answer") == "grade of answer"
+    assert llm.calls == 0
+
+
+def test_cached_llm_stores_whole_stream(disk_cache):
+    llm = CountingLLM()
+    cached_llm = make_cached_llm(llm, disk_cache)
+
+    assert list(cached_llm.stream_complete("answer")) == ["grade ", "of answer"]
+    assert cached_llm.complete("answer") == "grade of answer"
+    assert llm.calls == 1
+
+
+def test_cached_llm_bypassed_above_temperature_zero(disk_cache):
+    llm = CountingLLM()
+    cached_llm = make_cached_llm(llm, disk_cache, temperature=0.7)
+
+    cached_llm.complete("answer")
+    cached_llm.complete("answer")
+    assert llm.calls == 2
+    assert disk_cache.stats()["entries"] == 0
+
+
+def test_cached_llm_expires_entries(disk_cache):
+    llm = CountingLLM()
+    cached_llm = make_cached_llm(llm, disk_cache, ttl=-1)
+
+    cached_llm.complete("answer")
+    cached_llm.complete("answer")
+    assert llm.calls == 2
+
+
+def test_cached_llm_bounds_memory(disk_cache):
+    cached_llm = make_cached_llm(CountingLLM(), disk_cache, max_memory_entries=2)
+    for prompt in ["a", "b", "c"]:
+        cached_llm.complete(prompt)
+
+    assert len(cached_llm._memory) == 2
+    assert disk_cache.stats()["entries"] == 3
@@ -0,0 +1,107 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+import numpy as np
+import speech_recognition as sr
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.chunked_transcriber import ChunkedTranscriber, split_on_silence
+
+SAMPLE_RATE = 16000
+
+
+def make_audio(pattern):
+    """
+    Builds mono 16-bit audio from (seconds, is_speech) pairs, with a 440Hz
+    tone for speech and low noise for silence
+    """
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append(8000 * np.sin(2 * np.pi * 440 * t))
+        else:
+            parts.append(rng.normal(0, 30, n))
+    samples = np.concatenate(parts).astype(np.int16)
+    return sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2)
+
+
+@pytest.fixture
+def speech():
+    # three utterances separated by one second pauses
+    return make_audio([(3, True), (1, False), (4, True), (1, False), (2, True)])
+
+
+def test_split_on_silence_cuts_at_pauses(speech):
+    chunks = split_on_silence(speech, min_chunk_s=1)
+
+    assert len(chunks) == 3
+    assert [round(c.start, 1) for c in chunks] == [0.0, 3.5, 8.5]
+    assert chunks[-1].end == pytest.approx(11)
+    assert sum(len(c.audio.frame_data) for c in chunks) == len(speech.frame_data)
+
+
+def test_split_on_silence_limits_chunk_length(speech):
+    chunks = split_on_silence(speech, min_chunk_s=1, max_chunk_s=2)
+
+    assert len(chunks) > 3
+    assert all(c.end - c.start <= 2 + 1e-6 for c in chunks)
+
+
+def test_split_on_silence_merges_short_chunks(speech):
+    chunks = split_on_silence(speech, min_chunk_s=5)
+
+    assert [round(c.start, 1) for c in chunks] == [0.0, 8.5]
+
+
+def test_split_on_silence_drops_silence():
+    assert split_on_silence(make_audio([(2, False)])) == []
+
+
+def test_transcribe_stitches_chunks_in_order(speech):
+    def recognize(audio):
+        return f"{len(audio.frame_data) // (2 * SAMPLE_RATE)}s"
+
+    transcriber = ChunkedTranscriber(recognize, max_workers=3, min_chunk_s=1)
+    segments = transcriber.transcribe_segments(speech)
+
+    assert [s.text for s in segments] == ["3s", "5s", "2s"]
+    assert transcriber.transcribe(speech) == "3s 5s 2s"
+
+
+def test_transcribe_retries_failed_chunk_only(speech):
+    calls = []
+    lock = threading.Lock()
+
+    def recognize(audio):
+        with lock:
+            calls.append(audio.frame_data)
+            # the first request fails, whichever chunk it is for
+            if len(calls) == 1:
+                raise sr.RequestError("connection reset")
+        return "ok"
+
+    transcriber = ChunkedTranscriber(recognize, retry_delay=0, min_chunk_s=1)
+
+    assert transcriber.transcribe(speech) == "ok ok ok"
+    assert len(calls) == 4
+    assert calls.count(calls[0]) == 2
+
+
+def test_transcribe_raises_after_retries(speech):
+    def recognize(audio):
+        raise sr.RequestError("quota exceeded")
+
+    transcriber = ChunkedTranscriber(recognize, max_retries=1, retry_delay=0)
+    with pytest.raises(sr.RequestError):
+        transcriber.transcribe(speech)
+
+
+def test_transcribe_skips_unrecognised_chunks(speech):
+    def recognize(audio):
+        raise sr.UnknownValueError()
+
+    assert ChunkedTranscriber(recognize).transcribe(speech) == ""
@@ -0,0 +1,80 @@
+import pytest
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.utils.concurrency import imap_unordered, run_with_retries
+
+
+def test_run_with_retries_recovers():
+    attempts = []
+
+    def flaky(item):
+        attempts.append(item)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return item * 2
+
+    result = run_with_retries(flaky, 21, max_retries=2, retry_delay=0)
+
+    assert result.value == 42
+    assert result.error is None
+    assert result.attempts == 3
+
+
+def test_run_with_retries_returns_last_error():
+    def broken(item):
+        raise ValueError(f"bad {item}")
+
+    result = run_with_retries(broken, "cv.pdf", max_retries=1, retry_delay=0)
+
+    assert isinstance(result.error, ValueError)
+    assert result.attempts == 2
+
+
+def test_imap_unordered_streams_as_finished():
+    def work(item):
+        time.sleep(item)
+        return item
+
+    results = list(imap_unordered(work, [0.3, 0.0, 0.1], max_workers=3))
+
+    assert [r.value for r in results] == [0.0, 0.1, 0.3]
+
+
+def test_imap_unordered_isolates_failures():
+    def work(item):
+        if item == "bad.pdf":
+            raise ValueError("corrupted")
+        return item.upper()
+
+    results = {
+        r.item: r
+        for r in imap_unordered(
+            work, ["a.pdf", "bad.pdf", "b.pdf"], max_workers=2, retry_delay=0
+        )
+    }
+
+    assert results["a.pdf"].value == "A.PDF"
+    assert results["b.pdf"].value == "B.PDF"
+    assert isinstance(results["bad.pdf"].error, ValueError)
+    assert results["bad.pdf"].attempts == 3
+
+
+def test_imap_unordered_bounds_concurrency():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    list(imap_unordered(work, range(10), max_workers=2))
+
+    assert peak[0] <= 2
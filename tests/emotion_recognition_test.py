@@ -4,7 +4,11 @@ from pathlib import Path
 import numpy as np
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from src.service.emotion_recognition import EmotionRecognition
+from src.service.emotion_recognition import (
+    EmotionRecognition,
+    EmotionScoreAccumulator,
+)
+from src.domain.enums.emotion_types import EmotionType as DomainEmotionType
 
 
 # Mock EmotionType enum for testing
@@ -66,3 +70,103 @@ def test_normalize_scores():
     assert len(normalized_scores) == len(scores)
     assert min(normalized_scores) == 0
     assert max(normalized_scores) == 1
+
+
+def make_frame_result(emotion: dict) -> list:
+    return [{"emotion": emotion}]
+
+
+@pytest.fixture
+def frame_results():
+    rng = np.random.default_rng(0)
+    labels = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+    results = []
+    for _ in range(50):
+        probabilities = rng.dirichlet(np.ones(len(labels))) * 100
+        results.append(make_frame_result(dict(zip(labels, probabilities))))
+    # a frame without any detected face
+    results.append([])
+    return results
+
+
+def legacy_process_emotions(emotions: list) -> dict:
+    # Reference implementation of the original hand-written loop
+    labels = ["sad", "fear", "angry", "disgust", "happy", "neutral", "surprise"]
+    totals = dict.fromkeys(labels, 0)
+    count = 0
+    for frame_result in emotions:
+        if len(frame_result) > 0:
+            for label in labels:
+                totals[label] += frame_result[0]["emotion"][label]
+            count += 1
+    emots = {label: total / (count * 100) for label, total in totals.items()}
+
+    sad, fear, angry = emots["sad"] * 1.3, emots["fear"] * 1.3, emots["angry"] * 1.3
+    disgust, happy = emots["disgust"] * 10, emots["happy"] * 1.7
+    neutral, surprise = emots["neutral"] / 1.2, emots["surprise"] * 1.4
+
+    normalize = EmotionRecognition._EmotionRecognition__normalize_scores
+    mean = np.mean(normalize([sad, angry, surprise, fear, happy, disgust, neutral]))
+    result = np.mean(
+        normalize([-sad, -angry, surprise, -fear, happy, -disgust, neutral])
+    )
+    difference = min(abs((mean - result) / mean) * 100, 50)
+    conf = 50 - difference if mean > result else 50 + difference
+    return {"mean": mean, "result": result, "conf": conf}
+
+
+def test_process_emotions_matches_legacy_score(frame_results):
+    expected = legacy_process_emotions(frame_results)
+    emotions_dict = EmotionRecognition.process_emotions(frame_results)
+
+    for key in ["mean", "result", "conf"]:
+        assert emotions_dict[key] == pytest.approx(expected[key], rel=1e-12)
+
+
+def test_process_emotions_timeline(frame_results):
+    # 51 frames of 0.5s each, the last one without a face
+    emotions_dict = EmotionRecognition.process_emotions(
+        frame_results, weights=[0.5] * len(frame_results)
+    )
+
+    timeline = emotions_dict["timeline"]
+    assert len(timeline) == 26
+    assert np.isnan(timeline[-1])
+    assert np.all((timeline[:-1] >= 0) & (timeline[:-1] <= 100))
+
+
+def test_process_emotions_custom_weights(frame_results):
+    default = EmotionRecognition.process_emotions(frame_results)
+    reweighted = EmotionRecognition.process_emotions(
+        frame_results, emotion_weights={DomainEmotionType.DISGUST: 1}
+    )
+
+    assert reweighted["conf"] != default["conf"]
+
+
+def test_process_emotions_no_face():
+    with pytest.raises(ValueError):
+        EmotionRecognition.process_emotions([[], []])
+
+
+def test_accumulator_matches_batch_score(frame_results):
+    weights = list(np.linspace(0.1, 2, len(frame_results)))
+    accumulator = EmotionScoreAccumulator()
+
+    for i in range(0, len(frame_results), 8):
+        accumulator.update(frame_results[i : i + 8], weights[i : i + 8])
+
+    expected = EmotionRecognition.process_emotions(frame_results, weights=weights)
+    for key in ["mean", "result", "conf"]:
+        assert accumulator.result()[key] == pytest.approx(expected[key], rel=1e-12)
+    assert accumulator.n_frames == len(frame_results)
+
+
+def test_accumulator_convergence(frame_results):
+    accumulator = EmotionScoreAccumulator(tolerance=0.5, patience=2)
+
+    assert accumulator.update([[]]) is None
+    for _ in range(3):
+        accumulator.update(frame_results[:1])
+
+    assert accumulator.converged
@@ -0,0 +1,95 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.face_tracker import FaceTracker
+
+
+def make_frame(offset: int = 0) -> np.ndarray:
+    # Textured square "face" on a flat background
+    rng = np.random.default_rng(0)
+    frame = np.full((240, 320, 3), 50, dtype=np.uint8)
+    frame[80 : 80 + 64, 120 + offset : 184 + offset] = rng.integers(
+        0, 255, size=(64, 64, 3), dtype=np.uint8
+    )
+    return frame
+
+
+@pytest.fixture
+def mock_detection():
+    face_obj = {
+        "face": np.zeros((64, 64, 3), dtype=np.float32),
+        "facial_area": {"x": 120, "y": 80, "w": 64, "h": 64},
+        "confidence": 0.9,
+    }
+    with patch(
+        "src.service.face_tracker.DeepFace.extract_faces", return_value=[face_obj]
+    ) as mock_extract:
+        yield mock_extract
+
+
+def test_tracker_follows_face_without_detection(mock_detection):
+    tracker = FaceTracker(redetect_interval=10)
+
+    tracker.extract_faces(make_frame(0))
+    face_objs = tracker.extract_faces(make_frame(5))
+
+    assert mock_detection.call_count == 1
+    assert tracker.n_tracked == 1
+    assert face_objs[0]["facial_area"]["x"] == 125
+    assert face_objs[0]["face"].shape == (64, 64, 3)
+
+
+def test_tracker_redetects_when_face_is_lost(mock_detection):
+    tracker = FaceTracker(redetect_interval=10)
+
+    tracker.extract_faces(make_frame(0))
+    tracker.extract_faces(np.full((240, 320, 3), 50, dtype=np.uint8))
+
+    assert mock_detection.call_count == 2
+
+
+def test_tracker_redetects_after_interval(mock_detection):
+    tracker = FaceTracker(redetect_interval=2)
+
+    for _ in range(4):
+        tracker.extract_faces(make_frame(0))
+
+    assert tracker.n_detected == 2
+    assert tracker.n_tracked == 2
+
+
+def make_face_obj(x: int, y: int, size: int) -> dict:
+    return {
+        "face": np.zeros((size, size, 3), dtype=np.float32),
+        "facial_area": {"x": x, "y": y, "w": size, "h": size},
+        "confidence": 0.9,
+    }
+
+
+def test_tracker_puts_largest_face_first_on_detection():
+    small, large = make_face_obj(10, 10, 32), make_face_obj(120, 80, 64)
+    with patch(
+        "src.service.face_tracker.DeepFace.extract_faces", return_value=[small, large]
+    ):
+        face_objs = FaceTracker().extract_faces(make_frame(0))
+
+    assert face_objs == [large, small]
+
+
+def test_tracker_keeps_tracked_face_first_on_redetection():
+    tracked, other = make_face_obj(120, 80, 64), make_face_obj(200, 150, 80)
+    with patch(
+        "src.service.face_tracker.DeepFace.extract_faces",
+        side_effect=[[tracked], [other, make_face_obj(124, 82, 64)]],
+    ):
+        tracker = FaceTracker(redetect_interval=0)
+        tracker.extract_faces(make_frame(0))
+        face_objs = tracker.extract_faces(make_frame(4))
+
+    # the larger face of someone else stays second
+    assert face_objs[0]["facial_area"]["x"] == 124
+    assert face_objs[1] is other
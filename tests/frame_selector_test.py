@@ -0,0 +1,50 @@
+import pytest
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.frame_selector import AdaptiveFrameSelector
+
+
+def make_frames(levels: list[int]) -> list[np.ndarray]:
+    return [np.full((48, 64, 3), level, dtype=np.uint8) for level in levels]
+
+
+def test_selector_drops_static_frames():
+    selector = AdaptiveFrameSelector(min_fps=0.5, max_fps=2, threshold=6)
+    # 4s of video at 2fps, a scene change at frame 5
+    frames = make_frames([100, 100, 101, 100, 100, 200, 200, 200])
+
+    kept = list(selector.select(frames))
+
+    assert len(kept) == 3
+    assert selector.timestamps == [0, 2, 2.5]
+    assert selector.weights == [2, 0.5, 1.5]
+    assert sum(selector.weights) == pytest.approx(len(frames) / 2)
+
+
+def test_selector_keeps_every_changing_frame():
+    selector = AdaptiveFrameSelector(min_fps=0.5, max_fps=2, threshold=6)
+
+    kept = list(selector.select(make_frames([0, 50, 100, 150])))
+
+    assert len(kept) == 4
+    assert selector.weights == [0.5] * 4
+
+
+def test_selector_uses_actual_candidate_fps():
+    selector = AdaptiveFrameSelector(min_fps=0.5, max_fps=2, threshold=6)
+    # 4s of a 1fps video, slower than max_fps
+    frames = make_frames([100, 100, 200, 200])
+
+    kept = list(selector.select(frames, fps=1))
+
+    assert len(kept) == 2
+    assert selector.timestamps == [0, 2]
+    assert selector.weights == [2, 2]
+
+
+def test_selector_invalid_fps_range():
+    with pytest.raises(ValueError):
+        AdaptiveFrameSelector(min_fps=4, max_fps=2)
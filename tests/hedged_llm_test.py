@@ -0,0 +1,157 @@
+import pytest
+import sys
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm import llm as llm_module
+from src.llm.hedged_llm import HedgedLLM
+from src.llm.registry import ProviderRegistry
+from src.llm.scheduler import BATCH
+
+
+class FakeLLM(BaseLLMProvider):
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    def complete(self, prompt: str = "") -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        return self.name
+
+    def stream_complete(self, prompt: str = ""):
+        try:
+            yield self.complete(prompt)
+            yield " done"
+        finally:
+            self.closed += 1
+
+    async def acomplete(self, prompt: str = "") -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        return self.name
+
+
+def test_hedged_llm_uses_primary_when_fast():
+    primary, secondary = FakeLLM("openai", 0.01), FakeLLM("nvidia")
+    llm = HedgedLLM({"openai": primary, "nvidia": secondary}, hedge_after=0.2)
+
+    assert llm.complete("grade") == "openai"
+    assert secondary.calls == 0
+
+
+def test_hedged_llm_hedges_slow_primary():
+    primary, secondary = FakeLLM("openai", 0.5), FakeLLM("nvidia", 0.05)
+    llm = HedgedLLM({"openai": primary, "nvidia": secondary}, hedge_after=0.1)
+
+    start = time.perf_counter()
+    assert llm.complete("grade") == "nvidia"
+    assert time.perf_counter() - start < 0.4
+    assert primary.calls == 1
+
+
+def test_hedged_llm_fails_over_on_error():
+    primary, secondary = FakeLLM("openai", fail=True), FakeLLM("nvidia")
+    llm = HedgedLLM({"openai": primary, "nvidia": secondary}, hedge_after=10)
+
+    assert llm.complete("grade") == "nvidia"
+    assert llm.latency_stats()["openai"]["errors"] == 1
+
+
+def test_hedged_llm_does_not_hedge_queued_calls():
+    primary, secondary = FakeLLM("openai", 0.2), FakeLLM("nvidia")
+    llm = HedgedLLM(
+        {"openai": primary, "nvidia": secondary}, hedge_after=0.3, max_workers=1
+    )
+
+    # the calls wait for the only thread in turn, up to 0.4s
+    with ThreadPoolExecutor(max_workers=3) as callers:
+        results = list(callers.map(llm.complete, ["a", "b", "c"]))
+
+    assert results == ["openai"] * 3
+    assert secondary.calls == 0
+    assert llm.latency_stats()["openai"]["ewma_latency"] < 0.3
+
+
+def test_hedged_llm_needs_providers():
+    with pytest.raises(ValueError):
+        HedgedLLM({})
+
+
+def test_hedged_llm_raises_when_all_fail():
+    llm = HedgedLLM(
+        {"openai": FakeLLM("openai", fail=True), "nvidia": FakeLLM("nvidia", fail=True)}
+    )
+    with pytest.raises(ConnectionError):
+        llm.complete("grade")
+
+
+def test_hedged_llm_cancels_async_loser():
+    primary, secondary = FakeLLM("openai", 1.0), FakeLLM("nvidia", 0.05)
+    llm = HedgedLLM({"openai": primary, "nvidia": secondary}, hedge_after=0.05)
+
+    assert asyncio.run(llm.acomplete("grade")) == "nvidia"
+    assert primary.cancelled == 1
+
+
+def test_hedged_llm_closes_stream_loser():
+    primary, secondary = FakeLLM("openai", 0.3), FakeLLM("nvidia", 0.01)
+    llm = HedgedLLM({"openai": primary, "nvidia": secondary}, hedge_after=0.05)
+
+    assert "".join(llm.stream_complete("grade")) == "nvidia done"
+    time.sleep(0.4)
+    assert primary.closed == 1
+
+
+def test_hedged_llm_routes_by_latency_and_health():
+    fast, slow = FakeLLM("nvidia", 0.0), FakeLLM("openai", 0.02)
+    llm = HedgedLLM({"openai": slow, "nvidia": fast}, hedge_after=10, min_samples=2)
+
+    assert llm.route() == ["openai", "nvidia"]
+    for name, provider in [("openai", slow), ("nvidia", fast)]:
+        for _ in range(2):
+            provider.complete()
+            llm.stats[name].record_success(provider.latency)
+    assert llm.route() == ["nvidia", "openai"]
+
+    for _ in range(3):
+        llm.stats["nvidia"].record_error()
+    assert llm.route() == ["openai", "nvidia"]
+
+
+def test_get_llm_shares_hedged_llm(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    config_dir = Path(__file__).resolve().parent.parent / "src/configs/llm"
+    hedged_config = tmp_path / "hedged.yaml"
+    hedged_config.write_text(
+        "PROVIDER: hedged\n"
+        f"PROVIDERS:\n  - {config_dir}/openai-gpt-4o-mini.yaml\n"
+        f"  - {config_dir}/openai-gpt-3.5-turbo.yaml\n"
+        "HEDGE_AFTER: 10\nMAX_CONNECTIONS: 20"
+    )
+    monkeypatch.setattr(llm_module, "_registry", ProviderRegistry())
+
+    hedged = llm_module.get_llm(str(hedged_config))
+    assert isinstance(hedged, HedgedLLM)
+    assert llm_module.get_llm(str(hedged_config)) is hedged
+    assert llm_module.get_llm(str(hedged_config), priority=BATCH) is not hedged
+
+    llm_module._registry.close()
+    with pytest.raises(RuntimeError):
+        hedged.complete("grade")
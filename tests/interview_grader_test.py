@@ -0,0 +1,97 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.service.interview_grader import ONE_PASS, TWO_PASS, InterviewGrader
+
+GRADE = "Answer quality is good, confidence is high."
+RANKING = """```yaml
+name: Jane Doe
+score: 72
+feedback:
+  - Strong Python skills.
+  - Little MLOps experience.
+```"""
+GRADE_AND_RANK = """```yaml
+grades:
+  answer_quality: Clear and relevant.
+  problem_solving: Sound approach.
+  confidence: Confident delivery.
+  personality: Open and engaged.
+  overall_performance: Good overall.
+name: Jane Doe
+score: 70
+feedback:
+  - Strong Python skills.
+```"""
+
+
+class ScriptedLLM(BaseLLMProvider):
+    def __init__(self, completions: list[str]):
+        self.completions = completions
+        self.prompts = []
+
+    def complete(self, prompt: str = "") -> str:
+        self.prompts.append(prompt)
+        return self.completions[len(self.prompts) - 1]
+
+    def stream_complete(self, prompt: str = ""):
+        completion = self.complete(prompt)
+        for i in range(0, len(completion), 16):
+            yield completion[i : i + 16]
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return self.complete(prompt)
+
+
+def grade(grader: InterviewGrader, mode: str) -> dict:
+    return grader.grade(
+        interview_question="Tell me about a project.",
+        conf_score="80",
+        response_text="I built a recommender system.",
+        job_requirements="Python, MLOps",
+        resume_text="# Jane Doe\nPython developer",
+        mode=mode,
+    )
+
+
+def test_two_pass_feeds_grade_to_ranking():
+    llm = ScriptedLLM([GRADE, RANKING])
+    result = grade(InterviewGrader(llm), TWO_PASS)
+
+    assert len(llm.prompts) == 2
+    assert GRADE in llm.prompts[1]
+    assert result == {
+        "name": "Jane Doe",
+        "score": 72,
+        "feedback": ["Strong Python skills.", "Little MLOps experience."],
+    }
+
+
+def test_one_pass_grades_and_ranks_in_one_completion():
+    llm = ScriptedLLM([GRADE_AND_RANK])
+    result = grade(InterviewGrader(llm), ONE_PASS)
+
+    assert len(llm.prompts) == 1
+    assert "I built a recommender system." in llm.prompts[0]
+    assert "# Jane Doe\nPython developer" in llm.prompts[0]
+    assert result["score"] == 70
+    assert result["grades"]["problem_solving"] == "Sound approach."
+
+
+def test_stream_grade_yields_progress_before_result():
+    grader = InterviewGrader(ScriptedLLM([GRADE_AND_RANK]))
+    progress = list(
+        grader.stream_grade("question", "80", "answer", "Python", "resume", ONE_PASS)
+    )
+
+    assert all(p.result is None for p in progress[:-1])
+    assert progress[-2].grade == GRADE_AND_RANK
+    assert progress[-1].result["name"] == "Jane Doe"
+
+
+def test_unknown_grading_mode():
+    with pytest.raises(ValueError):
+        grade(InterviewGrader(ScriptedLLM([])), "three-pass")
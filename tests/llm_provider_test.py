@@ -0,0 +1,132 @@
+import pytest
+import sys
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.enums import DEFAULT_LLM_API_BASE
+from src.llm.nvidia_llm import NvidiaLLM
+from src.llm.openai_llm import OpenAILLM
+
+DELTAS = ["Strong ", "Python ", "skills."]
+NVIDIA_MODEL = "nvidia/llama-3.1-nemotron-70b-instruct"
+
+
+class ChatCompletionHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI compatible chat completion endpoint, streaming DELTAS as
+    server-sent events, or answering them at once when not streaming
+    """
+
+    def do_GET(self):
+        # the models listed by the endpoint
+        body = json.dumps({"data": [{"id": NVIDIA_MODEL, "object": "model"}]})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if not request.get("stream"):
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "test",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "".join(DELTAS),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for delta in DELTAS + [None]:
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "test",
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": delta},
+                        "finish_reason": None if delta else "stop",
+                    }
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("NVIDIA_API_KEY", "nvapi-test")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    # read by the OpenAI client at the default base URL
+    monkeypatch.setenv("OPENAI_API_BASE", url)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_openai_stream_complete_yields_deltas(base_url):
+    llm = OpenAILLM(model="gpt-4o-mini", base_url=DEFAULT_LLM_API_BASE)
+
+    # the stop chunk carries no text
+    assert [delta for delta in llm.stream_complete("grade") if delta] == DELTAS
+
+
+def test_nvidia_stream_complete_yields_deltas(base_url):
+    llm = NvidiaLLM(model=NVIDIA_MODEL, base_url=base_url)
+
+    # the stop chunk carries no text
+    assert [delta for delta in llm.stream_complete("grade") if delta] == DELTAS
+
+
+@pytest.mark.parametrize("provider", ["openai", "nvidia"])
+def test_acomplete_uses_async_http_client(base_url, provider):
+    requests = []
+
+    async def record(request):
+        requests.append(request.url.path)
+
+    async def acomplete():
+        async with httpx.AsyncClient(event_hooks={"request": [record]}) as client:
+            if provider == "openai":
+                llm = OpenAILLM(base_url=DEFAULT_LLM_API_BASE, async_http_client=client)
+            else:
+                llm = NvidiaLLM(
+                    model=NVIDIA_MODEL, base_url=base_url, async_http_client=client
+                )
+            return await llm.acomplete("grade")
+
+    assert asyncio.run(acomplete()) == "".join(DELTAS)
+    assert requests == ["/v1/chat/completions"]
@@ -0,0 +1,46 @@
+import pytest
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+
+
+class EchoLLM(BaseLLMProvider):
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def complete(self, prompt: str = "") -> str:
+        time.sleep(self.latency)
+        return prompt.upper()
+
+    async def acomplete(self, prompt: str = "") -> str:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return prompt.upper()
+
+
+def test_acomplete_many_keeps_prompt_order():
+    llm = EchoLLM()
+    prompts = [f"prompt {i}" for i in range(10)]
+
+    start = time.perf_counter()
+    completions = asyncio.run(llm.acomplete_many(prompts))
+    elapsed = time.perf_counter() - start
+
+    assert completions == [p.upper() for p in prompts]
+    # concurrent, not 10 round trips in a row
+    assert elapsed < 5 * llm.latency
+
+
+def test_acomplete_many_bounds_concurrency():
+    llm = EchoLLM(latency=0.01)
+    asyncio.run(llm.acomplete_many(["a"] * 10, max_concurrency=3))
+
+    assert llm.peak_in_flight == 3
@@ -0,0 +1,75 @@
+import itertools
+import pytest
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from moviepy.config import FFMPEG_BINARY
+from src.service.media_ingest import MediaIngest
+from src.utils.utils import extract_audio_pcm
+
+
+@pytest.fixture
+def mock_video(tmp_path):
+    # Create a 2s, 30fps test pattern with a 440Hz tone
+    video_file = str(tmp_path / "mock.mp4")
+    subprocess.run(
+        [FFMPEG_BINARY, "-loglevel", "error", "-y"]
+        + ["-f", "lavfi", "-i", "testsrc=size=160x120:rate=30"]
+        + ["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100"]
+        + ["-t", "2", "-pix_fmt", "yuv420p", "-shortest", video_file],
+        check=True,
+    )
+    return video_file
+
+
+def test_media_ingest_frames_and_audio(mock_video):
+    with MediaIngest(mock_video, sample_rate=10) as media:
+        frames = list(media.iter_frames())
+        audio = media.read_audio()
+
+    assert len(frames) == 6
+    assert frames[0].shape == (120, 160, 3)
+    assert audio.sample_rate == 16000
+    assert audio.sample_width == 2
+    assert len(audio.frame_data) / 2 / 16000 == pytest.approx(2, abs=0.1)
+
+
+def test_media_ingest_audio_only(mock_video):
+    with MediaIngest(mock_video, target_fps=1, max_size=80) as media:
+        audio = media.read_audio()
+
+    assert len(audio.frame_data) > 0
+
+
+def test_extract_audio_pcm_matches_media_ingest(mock_video):
+    with MediaIngest(mock_video, video=False) as media:
+        expected = media.read_audio()
+    audio = extract_audio_pcm(mock_video)
+
+    assert audio.sample_rate == 16000
+    assert audio.sample_width == 2
+    assert audio.frame_data == expected.frame_data
+
+
+@pytest.mark.parametrize("close_frames", [False, True])
+def test_media_ingest_audio_after_partial_frames(mock_video, close_frames):
+    media = MediaIngest(mock_video, sample_rate=1)
+    frames = media.iter_frames()
+    first_frames = list(itertools.islice(frames, 3))
+    if close_frames:
+        frames.close()
+
+    # 60 frames of 57.6KB fill the pipe, so ffmpeg blocks until they are read
+    result = {}
+    reader = threading.Thread(target=lambda: result.update(audio=media.read_audio()))
+    reader.start()
+    reader.join(timeout=30)
+    media.close()
+
+    assert not reader.is_alive()
+    assert len(first_frames) == 3
+    audio = result["audio"]
+    assert len(audio.frame_data) / 2 / 16000 == pytest.approx(2, abs=0.1)
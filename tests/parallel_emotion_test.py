@@ -0,0 +1,100 @@
+import pytest
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service import parallel_emotion
+from src.service.emotion_recognition import EmotionRecognition
+from src.service.parallel_emotion import ParallelEmotionAnalyzer
+
+
+@pytest.fixture
+def mock_video(tmp_path):
+    # 6s, 30fps clip whose frame brightness encodes the frame index
+    video_file = str(tmp_path / "mock.mp4")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for i in range(180):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+    return video_file
+
+
+@pytest.fixture
+def slow_video(tmp_path):
+    # 6s, 1fps clip, slower than the 2fps target
+    video_file = str(tmp_path / "slow.mp4")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"mp4v"), 1, (64, 48))
+    for i in range(6):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    return video_file
+
+
+@pytest.fixture
+def make_analyzer():
+    analyzers = []
+
+    def make_analyzer(n_workers: int) -> ParallelEmotionAnalyzer:
+        # segments analysed on threads, instead of spawning TensorFlow workers
+        analyzer = ParallelEmotionAnalyzer(n_workers=n_workers)
+        analyzer.close()
+        analyzer._executor = ThreadPoolExecutor(max_workers=n_workers)
+        analyzers.append(analyzer)
+        return analyzer
+
+    yield make_analyzer
+    for analyzer in analyzers:
+        analyzer.close()
+
+
+def test_analyzer_merges_segments_in_video_order(
+    mock_video, make_analyzer, monkeypatch
+):
+    segments = []
+
+    def analyze_segment(input_video_file, start, end, *args):
+        segments.append((start, end))
+        # the first segments finish last
+        time.sleep(0.2 - start / 50)
+        return [start, start], [0.5, 0.5]
+
+    monkeypatch.setattr(parallel_emotion, "_analyze_segment", analyze_segment)
+    emotions, weights = make_analyzer(4).analyze(mock_video)
+
+    assert emotions == [0, 0, 1.5, 1.5, 3, 3, 4.5, 4.5]
+    assert sorted(segments) == [(0, 1.5), (1.5, 3), (3, 4.5), (4.5, None)]
+
+
+@pytest.fixture
+def brightness_emotions(monkeypatch):
+    # the brightness of each frame as its emotion
+    monkeypatch.setattr(
+        EmotionRecognition,
+        "detect_face_emotions_tracked",
+        lambda frames, batch_size: [float(frame.mean()) for frame in frames],
+    )
+
+
+def test_analyzer_weights_sum_to_duration(
+    mock_video, make_analyzer, brightness_emotions
+):
+    emotions, weights = make_analyzer(3).analyze(mock_video, target_fps=2)
+
+    # one frame every 15, all kept as each differs from the previous one
+    assert len(emotions) == 12
+    assert emotions == sorted(emotions)
+    assert len(weights) == len(emotions)
+    assert sum(weights) == pytest.approx(6)
+
+
+def test_analyzer_weights_of_video_slower_than_target(
+    slow_video, make_analyzer, brightness_emotions
+):
+    emotions, weights = make_analyzer(2).analyze(slow_video, target_fps=2)
+
+    assert len(emotions) == 6
+    assert weights == pytest.approx([1] * 6)
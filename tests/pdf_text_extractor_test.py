@@ -0,0 +1,85 @@
+import pytest
+import sys
+from pathlib import Path
+import numpy as np
+import pymupdf
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.pdf_text_extractor import PdfTextExtractor
+
+BODY = (
+    "Trained and fine-tuned transformer models for document understanding, "
+    "and deployed them with MLOps tooling on Kubernetes."
+)
+
+
+@pytest.fixture
+def digital_pdf(tmp_path):
+    pdf_path = str(tmp_path / "resume.pdf")
+    with pymupdf.open() as document:
+        page = document.new_page()
+        y = 60
+        for text, size, font in [
+            ("Jane Doe", 20, "hebo"),
+            ("Experience", 14, "hebo"),
+            ("ML Engineer, Acme", 10, "hebo"),
+            (BODY[:70], 10, "helv"),
+            (BODY[70:], 10, "helv"),
+            ("• Built a resume parser", 10, "helv"),
+            ("Education", 14, "hebo"),
+            ("BSc Computer Science, 2020. " * 2, 10, "helv"),
+            ("Skills: Python, PyTorch, TensorFlow, Docker, Kubernetes", 10, "helv"),
+        ]:
+            page.insert_text((50, y), text, fontsize=size, fontname=font)
+            y += size * 2
+        document.save(pdf_path)
+    return pdf_path
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    pdf_path = str(tmp_path / "scan.pdf")
+    pixels = np.random.default_rng(0).integers(0, 255, (200, 150, 3), np.uint8)
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, 150, 200, pixels.tobytes(), False)
+    with pymupdf.open() as document:
+        page = document.new_page()
+        page.insert_image(page.rect, pixmap=pixmap)
+        document.save(pdf_path)
+    return pdf_path
+
+
+def test_extract_rebuilds_headers(digital_pdf):
+    markdown = PdfTextExtractor().extract(digital_pdf)
+    lines = [line for line in markdown.splitlines() if line]
+
+    assert lines[0] == "# Jane Doe"
+    assert "## Experience" in lines
+    assert "### ML Engineer, Acme" in lines
+    assert "## Education" in lines
+    assert "- Built a resume parser" in lines
+    assert BODY[:70].strip() in lines
+
+
+def test_extract_rejects_scanned_pdf(scanned_pdf):
+    assert PdfTextExtractor().extract(scanned_pdf) is None
+
+
+def test_extract_rejects_sparse_text(digital_pdf):
+    assert PdfTextExtractor(min_chars_per_page=5000).extract(digital_pdf) is None
+
+
+def test_extract_rejects_unreadable_pdf(digital_pdf, tmp_path):
+    corrupt_pdf = tmp_path / "corrupt.pdf"
+    corrupt_pdf.write_bytes(b"%PDF-1.7\n" + b"\x00" * 64)
+    encrypted_pdf = str(tmp_path / "encrypted.pdf")
+    with pymupdf.open(digital_pdf) as document:
+        document.save(
+            encrypted_pdf, encryption=pymupdf.PDF_ENCRYPT_AES_256, user_pw="secret"
+        )
+
+    assert PdfTextExtractor().extract(str(corrupt_pdf)) is None
+    assert PdfTextExtractor().extract(encrypted_pdf) is None
+
+
+def test_extract_rejects_pdf_without_text(scanned_pdf):
+    assert PdfTextExtractor(min_chars_per_page=0).extract(scanned_pdf) is None
@@ -0,0 +1,103 @@
+import pytest
+import sys
+from pathlib import Path
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.registry import ProviderRegistry
+
+CONFIG = {
+    "PROVIDER": "openai",
+    "BASE_URL": "default",
+    "MODEL": "gpt-4o-mini",
+    "TEMPERATURE": 0,
+    "MAX_CONNECTIONS": 4,
+    "REQUESTS_PER_MINUTE": 500,
+    "TOKENS_PER_MINUTE": 200000,
+}
+
+
+class FakeLLM:
+    def __init__(self, config, http_client, async_http_client):
+        self.config = config
+        self.http_client = http_client
+        self.async_http_client = async_http_client
+
+
+class FakeCompositeLLM:
+    def __init__(self, providers):
+        self.providers = providers
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def registry():
+    registry = ProviderRegistry()
+    yield registry
+    registry.close()
+
+
+def test_registry_memoizes_clients_by_config(registry):
+    llm = registry.get(dict(CONFIG), FakeLLM)
+
+    assert registry.get(dict(CONFIG), FakeLLM) is llm
+    assert registry.get({**CONFIG, "MODEL": "gpt-3.5-turbo"}, FakeLLM) is not llm
+
+
+def test_registry_shares_connection_pool_per_provider(registry):
+    gpt_4o = registry.get(CONFIG, FakeLLM)
+    gpt_35 = registry.get({**CONFIG, "MODEL": "gpt-3.5-turbo"}, FakeLLM)
+    nvidia = registry.get({**CONFIG, "PROVIDER": "nvidia"}, FakeLLM)
+
+    assert gpt_4o.http_client is gpt_35.http_client
+    assert gpt_4o.http_client is not nvidia.http_client
+    pool = gpt_4o.http_client._transport._pool
+    assert pool._max_connections == 4
+    assert pool._max_keepalive_connections == 4
+
+
+def test_registry_shares_async_connection_pool_per_provider(registry):
+    gpt_4o = registry.get(CONFIG, FakeLLM)
+    gpt_35 = registry.get({**CONFIG, "MODEL": "gpt-3.5-turbo"}, FakeLLM)
+    nvidia = registry.get({**CONFIG, "PROVIDER": "nvidia"}, FakeLLM)
+
+    assert isinstance(gpt_4o.async_http_client, httpx.AsyncClient)
+    assert gpt_4o.async_http_client is gpt_35.async_http_client
+    assert gpt_4o.async_http_client is not nvidia.async_http_client
+    pool = gpt_4o.async_http_client._transport._pool
+    assert pool._max_connections == 4
+    assert pool._max_keepalive_connections == 4
+
+
+def test_registry_memoizes_composites(registry):
+    hedged_config = {"PROVIDER": "hedged", "PROVIDERS": ["a.yaml", "b.yaml"]}
+
+    def build():
+        return FakeCompositeLLM([registry.get(CONFIG, FakeLLM)])
+
+    hedged = registry.get_composite(hedged_config, build, "configs", 0)
+
+    assert registry.get_composite(hedged_config, build, "configs", 0) is hedged
+    assert registry.get_composite(hedged_config, build, "configs", 1) is not hedged
+    assert hedged.providers[0] is registry.get(CONFIG, FakeLLM)
+
+
+def test_registry_close_forgets_clients(registry):
+    llm = registry.get(CONFIG, FakeLLM)
+    registry.close()
+
+    assert llm.http_client.is_closed
+    assert llm.async_http_client.is_closed
+    assert registry.get(CONFIG, FakeLLM) is not llm
+
+
+def test_registry_close_closes_composites(registry):
+    hedged = registry.get_composite(
+        {"PROVIDER": "hedged"}, lambda: FakeCompositeLLM([])
+    )
+    registry.close()
+
+    assert hedged.closed
@@ -0,0 +1,170 @@
+import pytest
+import sys
+import shutil
+from pathlib import Path
+import pymupdf
+import yaml
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service import resume_parser
+from src.service.resume_parser import (
+    CACHE_TIER,
+    LLAMAPARSE_TIER,
+    LOCAL_TIER,
+    ResumeParser,
+)
+from src.utils.cache import DiskCache
+
+CONFIG_FILE = (
+    Path(__file__).resolve().parent.parent / "src/configs/parser/llamaparse_en.yaml"
+)
+
+
+class FakeDirectoryReader:
+    """
+    Stands in for SimpleDirectoryReader with LlamaParse, counting the parses
+    """
+
+    n_calls = 0
+    text = "# Jane Doe"
+
+    def __init__(self, input_files, file_extractor):
+        self.input_files = input_files
+
+    def load_data(self):
+        FakeDirectoryReader.n_calls += 1
+        return [type("Document", (), {"text": FakeDirectoryReader.text})()]
+
+
+@pytest.fixture(autouse=True)
+def llamaparse(monkeypatch):
+    monkeypatch.setenv("LLAMA_CLOUD_API_KEY", "llx-test")
+    monkeypatch.setattr(FakeDirectoryReader, "n_calls", 0)
+    monkeypatch.setattr(FakeDirectoryReader, "text", "# Jane Doe")
+    monkeypatch.setattr(resume_parser, "SimpleDirectoryReader", FakeDirectoryReader)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / "resumes.sqlite"))
+
+
+@pytest.fixture
+def resume_pdf(tmp_path):
+    pdf_path = str(tmp_path / "resume.pdf")
+    with pymupdf.open() as document:
+        page = document.new_page()
+        for i in range(12):
+            page.insert_text(
+                (60, 60 + 20 * i), f"Built ML pipelines with Python, project {i}."
+            )
+        document.save(pdf_path)
+    return pdf_path
+
+
+def make_parser(tmp_path, cache: DiskCache, **overrides) -> ResumeParser:
+    with open(CONFIG_FILE, "r") as f:
+        config = yaml.safe_load(f)
+    config.update(overrides)
+    config_file = tmp_path / "parser.yaml"
+    config_file.write_text(yaml.safe_dump(config))
+    return ResumeParser(str(config_file), cache=cache)
+
+
+def count_extractions(parser: ResumeParser) -> list:
+    calls = []
+    extract = parser._extractor.extract
+    parser._extractor.extract = lambda path: calls.append(path) or extract(path)
+    return calls
+
+
+def test_cached_resume_skips_local_extractor(tmp_path, cache, resume_pdf):
+    parser = make_parser(tmp_path, cache)
+    calls = count_extractions(parser)
+    # the same PDF bytes, uploaded again under another name
+    copy_pdf = shutil.copy(resume_pdf, tmp_path / "copy.pdf")
+
+    resume_md, tier = parser.parse_resume(resume_pdf)
+    assert tier == LOCAL_TIER
+    assert parser.parse_resume(str(copy_pdf)) == (resume_md, CACHE_TIER)
+    assert len(calls) == 1
+    assert parser.tier_counts == {LOCAL_TIER: 1, CACHE_TIER: 1}
+
+
+def test_cached_resume_skips_llamaparse(tmp_path, cache, resume_pdf):
+    parser = make_parser(tmp_path, cache, LOCAL_FAST_PATH=False)
+
+    assert parser.parse_resume(resume_pdf) == ("# Jane Doe", LLAMAPARSE_TIER)
+    assert parser.parse_resume(resume_pdf) == ("# Jane Doe", CACHE_TIER)
+    assert FakeDirectoryReader.n_calls == 1
+
+
+@pytest.mark.parametrize("overrides", [{"LANGUAGE": "fr"}, {"LOCAL_FAST_PATH": False}])
+def test_cache_key_depends_on_settings(tmp_path, cache, resume_pdf, overrides):
+    make_parser(tmp_path, cache).parse_resume(resume_pdf)
+
+    _, tier = make_parser(tmp_path, cache, **overrides).parse_resume(resume_pdf)
+    assert tier != CACHE_TIER
+
+
+def test_cache_key_depends_on_prompt(tmp_path, cache, resume_pdf, monkeypatch):
+    make_parser(tmp_path, cache).parse_resume(resume_pdf)
+
+    monkeypatch.setattr(resume_parser, "PARSE_RESUME_PROMPT", "Parse the resume.")
+    _, tier = make_parser(tmp_path, cache).parse_resume(resume_pdf)
+    assert tier == LOCAL_TIER
+
+
+def test_empty_llamaparse_result_is_not_cached(tmp_path, cache, resume_pdf):
+    parser = make_parser(tmp_path, cache, LOCAL_FAST_PATH=False)
+    FakeDirectoryReader.text = " \n"
+
+    with pytest.raises(RuntimeError, match="no text"):
+        parser.parse_resume(resume_pdf)
+
+    FakeDirectoryReader.text = "# Jane Doe"
+    assert parser.parse_resume(resume_pdf) == ("# Jane Doe", LLAMAPARSE_TIER)
+    assert FakeDirectoryReader.n_calls == 2
+
+
+def test_unreadable_pdf_falls_back_to_llamaparse(tmp_path, cache):
+    corrupt_pdf = tmp_path / "corrupt.pdf"
+    corrupt_pdf.write_bytes(b"%PDF-1.7\n" + b"\x00" * 64)
+    parser = make_parser(tmp_path, cache)
+
+    assert parser.parse_resume(str(corrupt_pdf)) == ("# Jane Doe", LLAMAPARSE_TIER)
+
+
+class FlakyDirectoryReader(FakeDirectoryReader):
+    """
+    Returns no document for the first 'failures' parses, as LlamaParse does on
+    API errors when ignoring them
+    """
+
+    failures = 0
+
+    def load_data(self):
+        if FakeDirectoryReader.n_calls < self.failures:
+            FakeDirectoryReader.n_calls += 1
+            return []
+        return super().load_data()
+
+
+@pytest.mark.parametrize("failures, expected_md", [(1, "# Jane Doe"), (3, None)])
+def test_parse_resumes_retries_empty_llamaparse_result(
+    tmp_path, resume_pdf, monkeypatch, failures, expected_md
+):
+    monkeypatch.setattr(FlakyDirectoryReader, "failures", failures)
+    monkeypatch.setattr(resume_parser, "SimpleDirectoryReader", FlakyDirectoryReader)
+    parser = make_parser(tmp_path, cache=None, LOCAL_FAST_PATH=False)
+
+    [result] = parser.parse_resumes([resume_pdf], max_retries=2, retry_delay=0)
+
+    assert FakeDirectoryReader.n_calls == min(failures + 1, 3)
+    assert result.markdown == expected_md
+    if expected_md is None:
+        assert isinstance(result.error, RuntimeError)
+        assert result.tier is None
+    else:
+        assert result.error is None
+        assert result.tier == LLAMAPARSE_TIER
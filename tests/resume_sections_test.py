@@ -0,0 +1,101 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.resume_sections import (
+    ResumeSectionSelector,
+    estimate_tokens,
+    split_sections,
+)
+
+RESUME_MD = """Jane Doe
+jane@example.com
+
+# 1 Experience
+
+## 1.1 ML Engineer, Acme
+- Fine-tuned transformer models with PyTorch
+- Deployed models with Kubernetes and MLflow
+
+## 1.2 Barista, Cafe
+- Prepared coffee and handled the cash register
+
+# 2 Education
+BSc Computer Science
+
+# 3 Hobbies
+Hiking, painting, and playing the piano on weekends
+"""
+
+JOB_REQUIREMENTS = "Experience with PyTorch transformer models, MLOps and Kubernetes"
+
+
+def test_split_sections_follows_header_hierarchy():
+    sections = split_sections(RESUME_MD)
+
+    assert [(s.level, s.title) for s in sections] == [
+        (0, ""),
+        (1, "1 Experience"),
+        (2, "1.1 ML Engineer, Acme"),
+        (2, "1.2 Barista, Cafe"),
+        (1, "2 Education"),
+        (1, "3 Hobbies"),
+    ]
+    assert sections[0].body == "Jane Doe\njane@example.com"
+    assert sections[2].parents == [1]
+    assert sections[4].parents == []
+
+
+def test_score_ranks_relevant_section_first():
+    sections = split_sections(RESUME_MD)
+    scores = ResumeSectionSelector().score(sections, JOB_REQUIREMENTS)
+
+    assert max(range(len(scores)), key=scores.__getitem__) == 2
+    assert scores[5] == 0
+
+
+def test_select_keeps_relevant_sections_within_budget():
+    budget = 60
+    selected = ResumeSectionSelector(token_budget=budget).select(
+        RESUME_MD, JOB_REQUIREMENTS
+    )
+
+    assert estimate_tokens(selected) <= budget
+    assert selected.startswith("Jane Doe")
+    # the parent header is kept for context, in the original order
+    assert selected.index("# 1 Experience") < selected.index("## 1.1 ML Engineer")
+    assert "Kubernetes" in selected
+    assert "Barista" not in selected
+    assert "Hobbies" not in selected
+
+
+def test_select_keeps_short_resume_unchanged():
+    selector = ResumeSectionSelector(token_budget=10_000)
+    assert selector.select(RESUME_MD, JOB_REQUIREMENTS) == RESUME_MD
+
+
+def test_select_truncates_relevant_section_over_budget():
+    bullets = "\n".join(
+        f"- Built ML pipeline {i} with Python, PyTorch and MLOps tooling"
+        for i in range(60)
+    )
+    resume_md = (
+        "Jane Doe\n\n"
+        f"# Experience\n{bullets}\n\n"
+        "# Education\nBSc Computer Science\n\n"
+        "# Hobbies\nHiking, painting, and playing the piano on weekends\n"
+    )
+    budget = 200
+    assert estimate_tokens(f"# Experience\n{bullets}") > budget
+
+    selected = ResumeSectionSelector(token_budget=budget).select(
+        resume_md, "Python, PyTorch and MLOps engineer"
+    )
+
+    assert estimate_tokens(selected) <= budget
+    assert selected.startswith("Jane Doe\n\n# Experience\n- Built ML pipeline 0 ")
+    # cut at a bullet boundary
+    kept_bullets = selected.split("# Experience\n")[1].split("\n\n")[0].splitlines()
+    assert 0 < len(kept_bullets) < 60
+    assert kept_bullets == bullets.splitlines()[: len(kept_bullets)]
@@ -0,0 +1,316 @@
+import pytest
+import sys
+import time
+import socket
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import httpx
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.llm.base_llm_provider import BaseLLMProvider
+from src.llm.scheduler import BATCH, INTERACTIVE, LLMScheduler, ScheduledLLM
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Local completion endpoint answering after 'latency' seconds, that rejects
+    the first 'n_rate_limited' requests with 429 & 'retry_after'
+    """
+
+    def __init__(self, latency=0.0, n_rate_limited=0, retry_after=None):
+        super().__init__(("127.0.0.1", 0), FakeLLMHandler)
+        self.latency = latency
+        self.n_rate_limited = n_rate_limited
+        self.retry_after = retry_after
+        self.n_requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        prompt = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.n_requests += 1
+            rate_limited = server.n_requests <= server.n_rate_limited
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+
+        if rate_limited:
+            self.send_response(429)
+            if server.retry_after is not None:
+                self.send_header("Retry-After", server.retry_after)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(prompt)))
+            self.end_headers()
+            self.wfile.write(prompt.upper())
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpLLM(BaseLLMProvider):
+    def __init__(self, url: str):
+        self.url = url
+        self.n_calls = 0
+        self._client = httpx.Client()
+
+    def complete(self, prompt: str = "") -> str:
+        self.n_calls += 1
+        response = self._client.post(self.url, content=prompt)
+        response.raise_for_status()
+        return response.text
+
+    def stream_complete(self, prompt: str = ""):
+        yield self.complete(prompt)
+
+    async def acomplete(self, prompt: str = "") -> str:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(self.url, content=prompt)
+        response.raise_for_status()
+        return response.text
+
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def make_server(**kwargs):
+        server = FakeLLMServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield make_server
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_scheduler_retries_rate_limits(make_server):
+    server = make_server(n_rate_limited=2)
+    llm = ScheduledLLM(HttpLLM(server.url), LLMScheduler(base_delay=0.01))
+
+    assert llm.complete("grade") == "GRADE"
+    assert server.n_requests == 3
+
+
+def test_scheduled_stream_retries_before_first_token(make_server):
+    server = make_server(n_rate_limited=2)
+    llm = ScheduledLLM(HttpLLM(server.url), LLMScheduler(base_delay=0.01))
+
+    assert list(llm.stream_complete("grade")) == ["GRADE"]
+    assert server.n_requests == 3
+
+
+def test_scheduler_respects_retry_after(make_server):
+    server = make_server(n_rate_limited=1, retry_after="1")
+    llm = ScheduledLLM(HttpLLM(server.url), LLMScheduler(base_delay=0.01))
+
+    start = time.perf_counter()
+    assert llm.complete("grade") == "GRADE"
+    assert time.perf_counter() - start >= 1
+
+
+def test_scheduler_gives_up_after_max_retries(make_server):
+    server = make_server(n_rate_limited=10)
+    scheduler = LLMScheduler(max_retries=2, base_delay=0.01)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        ScheduledLLM(HttpLLM(server.url), scheduler).complete("grade")
+    assert server.n_requests == 3
+
+
+def test_scheduler_retries_connection_errors():
+    # a port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    llm = HttpLLM(url)
+
+    scheduler = LLMScheduler(max_retries=2, base_delay=0.01)
+    with pytest.raises(httpx.ConnectError):
+        ScheduledLLM(llm, scheduler).complete("grade")
+    assert llm.n_calls == 3
+
+
+def test_scheduler_retries_openai_connection_errors():
+    class APIConnectionError(Exception):
+        # as openai's, raised with the request & no response
+        def __init__(self, request):
+            super().__init__("Connection error.")
+            self.request = request
+
+    calls = []
+
+    def fail_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise APIConnectionError(httpx.Request("POST", "http://llm"))
+        return "ok"
+
+    assert LLMScheduler(base_delay=0.01).run(fail_once) == "ok"
+    assert len(calls) == 2
+
+
+def test_scheduler_does_not_retry_client_errors():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("invalid prompt")
+
+    with pytest.raises(ValueError):
+        LLMScheduler(base_delay=0.01).run(fail)
+    assert len(calls) == 1
+
+
+def test_scheduler_bounds_concurrency(make_server):
+    server = make_server(latency=0.05)
+    llm = ScheduledLLM(HttpLLM(server.url), LLMScheduler(max_concurrency=2))
+
+    threads = [threading.Thread(target=llm.complete, args=("a",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.n_requests == 8
+    assert server.peak_in_flight == 2
+
+
+class SlowStreamLLM(BaseLLMProvider):
+    """
+    Streams 'n_pieces' pieces 'delay' seconds apart, tracking the peak number
+    of streams running at once
+    """
+
+    def __init__(self, n_pieces: int = 3, delay: float = 0.02):
+        self.n_pieces = n_pieces
+        self.delay = delay
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+
+    def complete(self, prompt: str = "") -> str:
+        return "".join(self.stream_complete(prompt))
+
+    def stream_complete(self, prompt: str = ""):
+        with self.lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            for i in range(self.n_pieces):
+                time.sleep(self.delay)
+                yield f"{prompt}{i}"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    async def acomplete(self, prompt: str = "") -> str:
+        return self.complete(prompt)
+
+
+def test_scheduler_bounds_concurrent_streams():
+    llm = SlowStreamLLM()
+    scheduled_llm = ScheduledLLM(llm, LLMScheduler(max_concurrency=1))
+    streams = {}
+
+    def stream(prompt):
+        streams[prompt] = list(scheduled_llm.stream_complete(prompt))
+
+    threads = [threading.Thread(target=stream, args=(f"p{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert streams == {f"p{i}": [f"p{i}0", f"p{i}1", f"p{i}2"] for i in range(4)}
+    assert llm.peak_active == 1
+
+
+def test_closed_stream_releases_its_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+    llm = ScheduledLLM(SlowStreamLLM(delay=0), scheduler)
+
+    stream = llm.stream_complete("a")
+    assert next(stream) == "a0"
+    assert scheduler._in_flight == 1
+    stream.close()
+
+    assert scheduler._in_flight == 0
+    assert list(llm.stream_complete("b")) == ["b0", "b1", "b2"]
+
+
+def test_scheduler_bounds_concurrency_async(make_server):
+    server = make_server(latency=0.05)
+    llm = ScheduledLLM(HttpLLM(server.url), LLMScheduler(max_concurrency=3))
+
+    completions = asyncio.run(llm.acomplete_many([f"p{i}" for i in range(9)]))
+
+    assert completions == [f"P{i}" for i in range(9)]
+    assert server.peak_in_flight == 3
+
+
+def test_scheduler_limits_requests_per_minute():
+    # 1200/min, i.e. 20/s with bursts of 20
+    scheduler = LLMScheduler(requests_per_minute=1200)
+
+    start = time.perf_counter()
+    for _ in range(30):
+        scheduler.run(lambda: None)
+    assert time.perf_counter() - start == pytest.approx(0.5, abs=0.15)
+
+
+def test_scheduler_limits_tokens_per_minute():
+    # 60000/min, i.e. 1000 tokens/s with bursts of 1000
+    scheduler = LLMScheduler(tokens_per_minute=60000)
+
+    start = time.perf_counter()
+    for _ in range(3):
+        scheduler.run(lambda: None, tokens=500)
+    assert time.perf_counter() - start == pytest.approx(0.5, abs=0.15)
+
+
+def test_scheduler_runs_interactive_before_batch(make_server):
+    server = make_server(latency=0.1)
+    scheduler = LLMScheduler(max_concurrency=1)
+    batch_llm = ScheduledLLM(HttpLLM(server.url), scheduler, priority=BATCH)
+    interactive_llm = ScheduledLLM(HttpLLM(server.url), scheduler, INTERACTIVE)
+    finished = []
+
+    def complete(llm, name):
+        llm.complete(name)
+        finished.append(name)
+
+    threads = [threading.Thread(target=complete, args=(batch_llm, "batch 0"))]
+    threads[0].start()
+    time.sleep(0.02)  # batch 0 is in flight
+    for i in range(1, 4):
+        threads.append(
+            threading.Thread(target=complete, args=(batch_llm, f"batch {i}"))
+        )
+        threads[-1].start()
+    while len(scheduler._queue) < 3:
+        time.sleep(0.001)
+    threads.append(
+        threading.Thread(target=complete, args=(interactive_llm, "interactive"))
+    )
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+
+    assert finished[:2] == ["batch 0", "interactive"]
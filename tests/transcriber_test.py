@@ -0,0 +1,56 @@
+import pytest
+import sys
+from pathlib import Path
+import speech_recognition as sr
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.service.chunked_transcriber import ChunkedTranscriber
+from src.transcription.google_transcriber import GoogleTranscriber
+from src.transcription.sphinx_transcriber import SphinxTranscriber
+from src.transcription.stub_transcriber import StubTranscriber
+from src.transcription.transcriber import get_transcriber
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "src/configs/transcription"
+
+
+@pytest.fixture
+def one_second_audio():
+    return sr.AudioData(b"\x00\x00" * 16000, 16000, 2)
+
+
+@pytest.mark.parametrize(
+    "config_file, transcriber_class",
+    [
+        ("google-en.yaml", GoogleTranscriber),
+        ("sphinx-en.yaml", SphinxTranscriber),
+        ("stub.yaml", StubTranscriber),
+    ],
+)
+def test_get_transcriber(config_file, transcriber_class):
+    transcriber = get_transcriber(str(CONFIG_DIR / config_file))
+    assert isinstance(transcriber, transcriber_class)
+
+
+def test_get_transcriber_unknown_provider(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("PROVIDER: unknown\nLANGUAGE: en-US")
+    with pytest.raises(ValueError):
+        get_transcriber(str(config_file))
+
+
+def test_stub_transcriber_is_deterministic(one_second_audio):
+    transcriber = get_transcriber(str(CONFIG_DIR / "stub.yaml"))
+    assert transcriber.transcribe(one_second_audio) == "1.00 seconds of speech"
+    assert transcriber.transcribe(one_second_audio) == "1.00 seconds of speech"
+
+
+def test_chunked_transcriber_with_stub():
+    # two utterances separated by a one second pause
+    tone = (b"\x00\x20" + b"\x00\xe0") * 8000
+    silence = b"\x00\x00" * 16000
+    audio = sr.AudioData(tone * 2 + silence + tone, 16000, 2)
+
+    transcriber = ChunkedTranscriber(
+        StubTranscriber(text="{duration:.1f}").transcribe, min_chunk_s=0
+    )
+    assert transcriber.transcribe(audio) == "2.5 1.5"
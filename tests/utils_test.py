@@ -0,0 +1,73 @@
+import pytest
+import sys
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.utils.utils import iter_frames, sample_frames, sampled_fps
+
+
+@pytest.fixture
+def mock_video(tmp_path):
+    # Create a 3s, 30fps clip whose frame brightness encodes the frame index
+    video_file = str(tmp_path / "mock.mp4")
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for i in range(90):
+        writer.write(np.full((48, 64, 3), i * 2, dtype=np.uint8))
+    writer.release()
+    return video_file
+
+
+def test_sample_frames_grab_matches_read(mock_video):
+    read_frames = sample_frames(mock_video, sample_rate=8, method="read")
+    grab_frames = sample_frames(mock_video, sample_rate=8, method="grab")
+
+    assert len(read_frames) == len(grab_frames) == 12
+    for read_frame, grab_frame in zip(read_frames, grab_frames):
+        assert np.array_equal(read_frame, grab_frame)
+
+
+def test_sample_frames_target_fps(mock_video):
+    frames = sample_frames(mock_video, target_fps=2)
+    seek_frames = sample_frames(mock_video, target_fps=2, method="seek")
+
+    assert len(frames) == len(seek_frames) == 6
+    assert frames[0].shape == (48, 64, 3)
+
+
+def test_sample_frames_invalid_method(mock_video):
+    with pytest.raises(ValueError):
+        sample_frames(mock_video, method="unknown")
+
+
+def test_iter_frames_is_lazy_and_downscales(mock_video):
+    frames = iter_frames(mock_video, sample_rate=8, max_size=32)
+
+    first = next(frames)
+    assert first.shape == (24, 32, 3)
+    assert len(list(frames)) == 11
+
+
+@pytest.mark.parametrize("method", ["read", "grab", "seek"])
+def test_iter_frames_respects_segment_bounds(mock_video, method):
+    # frames 30 to 59 of the clip, one every 8 frames
+    frames = list(iter_frames(mock_video, sample_rate=8, method=method, start=1, end=2))
+
+    levels = [float(frame.mean()) for frame in frames]
+    assert levels == pytest.approx([60, 76, 92, 108], abs=3)
+
+
+@pytest.mark.parametrize("method", ["read", "grab", "seek"])
+def test_iter_frames_open_ended_segment(mock_video, method):
+    frames = list(iter_frames(mock_video, sample_rate=8, method=method, start=2.5))
+
+    levels = [float(frame.mean()) for frame in frames]
+    # frames 75, 83
+    assert levels == pytest.approx([150, 166], abs=3)
+
+
+def test_sampled_fps_is_capped_by_source_fps(mock_video):
+    assert sampled_fps(mock_video, target_fps=2) == pytest.approx(2)
+    assert sampled_fps(mock_video, target_fps=60) == pytest.approx(30)
+    assert sampled_fps(mock_video, sample_rate=3) == pytest.approx(10)